@@ -6,9 +6,92 @@
 
 import re
 from collections import Counter, defaultdict
+from collections.abc import Mapping
 from datetime import datetime
 import string
 
+from profiling import profiler
+
+# Report sections, in the order display_analysis prints them
+SECTIONS = (
+    'basic_stats', 'content_analysis', 'section_classification', 'temporal_analysis',
+    'readability', 'keywords', 'sentiment_indicators'
+)
+
+
+class ContextReport(Mapping):
+    """
+    Lazy analysis report: each section is computed on first access and then
+    memoized. Work shared between sections (word extraction, sentence
+    splitting, stop-word filtering) is also done once per report.
+    Behaves like the dict returned by analyze_text, so display_analysis
+    accepts it directly.
+    """
+
+    def __init__(self, analyzer, text):
+        self.analyzer = analyzer
+        self.text = text
+        self._sections = {}
+        self._words = None
+        self._sentences = None
+        self._content_words = None
+
+    @property
+    def words(self):
+        if self._words is None:
+            self._words = self.analyzer._extract_words(self.analyzer._clean_text(self.text))
+        return self._words
+
+    @property
+    def sentences(self):
+        if self._sentences is None:
+            self._sentences = self.analyzer._split_sentences(self.text)
+        return self._sentences
+
+    @property
+    def content_words(self):
+        if self._content_words is None:
+            stop_words = self.analyzer.stop_words
+            self._content_words = [word for word in self.words if word not in stop_words]
+        return self._content_words
+
+    def _compute(self, section):
+        analyzer = self.analyzer
+        if section == 'basic_stats':
+            return analyzer._get_basic_stats(self.text, self.words, self.sentences)
+        if section == 'content_analysis':
+            return analyzer._analyze_content(self.words, self.content_words)
+        if section == 'section_classification':
+            return analyzer._classify_section(self.words)
+        if section == 'temporal_analysis':
+            return analyzer._analyze_temporal_elements(self.text)
+        if section == 'readability':
+            return analyzer._analyze_readability(self.text, self.words, self.sentences)
+        if section == 'keywords':
+            return analyzer._extract_keywords(self.words, self.content_words)
+        return analyzer._basic_sentiment_analysis(self.words)
+
+    def __getitem__(self, section):
+        if section not in self._sections:
+            if section not in SECTIONS:
+                raise KeyError(section)
+            self._sections[section] = self._compute(section)
+        return self._sections[section]
+
+    def __contains__(self, section):
+        return section in SECTIONS
+
+    def __iter__(self):
+        return iter(SECTIONS)
+
+    def __len__(self):
+        return len(SECTIONS)
+
+    def computed(self):
+        """Names of the sections computed so far."""
+        return [section for section in SECTIONS if section in self._sections]
+
+
 class ContextAnalyzer:
     def __init__(self):
         self.stop_words = {
@@ -32,6 +115,19 @@ class ContextAnalyzer:
             'obituary': ['died', 'passed', 'funeral', 'survived', 'memorial', 'beloved']
         }
         
+        # Sentiment word lists
+        self.positive_words = {
+            'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'positive',
+            'success', 'achievement', 'victory', 'win', 'celebrate', 'happy', 'joy',
+            'love', 'like', 'enjoy', 'pleased', 'satisfied', 'delighted', 'thrilled'
+        }
+        
+        self.negative_words = {
+            'bad', 'terrible', 'awful', 'horrible', 'negative', 'problem', 'issue',
+            'failure', 'defeat', 'loss', 'sad', 'angry', 'disappointed', 'frustrated',
+            'hate', 'dislike', 'worried', 'concerned', 'crisis', 'disaster', 'tragedy'
+        }
+        
         # Time-related patterns
         self.time_patterns = {
             'date': r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
@@ -40,28 +136,30 @@ class ContextAnalyzer:
             'month': r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\b'
         }
 
-    def analyze_text(self, text):
+    def analyze_text(self, text, sections=None):
         """
-        Main analysis function that returns comprehensive context analysis
+        Main analysis function that returns comprehensive context analysis.
+        `sections` optionally names the parts of SECTIONS to compute;
+        by default all of them are.
         """
         if not text or not text.strip():
             return {"error": "No text provided for analysis"}
-        
-        # Clean and prepare text
-        cleaned_text = self._clean_text(text)
-        words = self._extract_words(cleaned_text)
-        
-        analysis = {
-            'basic_stats': self._get_basic_stats(text, words),
-            'content_analysis': self._analyze_content(words),
-            'section_classification': self._classify_section(words),
-            'temporal_analysis': self._analyze_temporal_elements(text),
-            'readability': self._analyze_readability(text, words),
-            'keywords': self._extract_keywords(words),
-            'sentiment_indicators': self._basic_sentiment_analysis(words)
-        }
-        
-        return analysis
+
+        unknown = set(sections or ()) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown analysis section(s): {', '.join(sorted(unknown))}")
+
+        report = ContextReport(self, text)
+        return {section: report[section] for section in (sections or SECTIONS)}
+
+    def report(self, text):
+        """
+        Return a lazy ContextReport for `text`, computing each section only
+        when it is first read.
+        """
+        if not text or not text.strip():
+            return {"error": "No text provided for analysis"}
+        return ContextReport(self, text)
 
     def _clean_text(self, text):
         """Clean text for analysis"""
@@ -76,10 +174,15 @@ class ContextAnalyzer:
         words = re.findall(r'\b[a-zA-Z]+\b', text)
         return words
 
-    def _get_basic_stats(self, original_text, words):
+    def _split_sentences(self, text):
+        """Split text into non-empty sentences"""
+        sentences = re.split(r'[.!?]+', text)
+        return [s.strip() for s in sentences if s.strip()]
+
+    def _get_basic_stats(self, original_text, words, sentences=None):
         """Get basic text statistics"""
-        sentences = re.split(r'[.!?]+', original_text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        if sentences is None:
+            sentences = self._split_sentences(original_text)
         
         paragraphs = original_text.split('\n\n')
         paragraphs = [p.strip() for p in paragraphs if p.strip()]
@@ -93,24 +196,26 @@ class ContextAnalyzer:
             'avg_sentences_per_paragraph': len(sentences) / len(paragraphs) if paragraphs else 0
         }
 
-    def _analyze_content(self, words):
+    def _analyze_content(self, words, content_words=None):
         """Analyze content characteristics"""
         if not words:
             return {}
         
         # Filter out stop words
-        content_words = [word for word in words if word not in self.stop_words]
+        if content_words is None:
+            content_words = [word for word in words if word not in self.stop_words]
         
         # Most common words
         word_freq = Counter(content_words)
         most_common = word_freq.most_common(10)
         
         # Unique words ratio
-        unique_ratio = len(set(words)) / len(words) if words else 0
+        unique_words = len(set(words))
+        unique_ratio = unique_words / len(words) if words else 0
         
         return {
             'total_words': len(words),
-            'unique_words': len(set(words)),
+            'unique_words': unique_words,
             'content_words': len(content_words),
             'unique_word_ratio': round(unique_ratio, 3),
             'most_common_words': most_common,
@@ -152,10 +257,10 @@ class ContextAnalyzer:
         
         return temporal_elements
 
-    def _analyze_readability(self, text, words):
+    def _analyze_readability(self, text, words, sentences=None):
         """Basic readability analysis"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        if sentences is None:
+            sentences = self._split_sentences(text)
         
         if not sentences or not words:
             return {}
@@ -196,10 +301,12 @@ class ContextAnalyzer:
             'reading_level': level
         }
 
-    def _extract_keywords(self, words):
+    def _extract_keywords(self, words, content_words=None):
         """Extract potential keywords"""
         # Filter out stop words and short words
-        keywords = [word for word in words if word not in self.stop_words and len(word) > 3]
+        if content_words is None:
+            content_words = [word for word in words if word not in self.stop_words]
+        keywords = [word for word in content_words if len(word) > 3]
         
         # Count frequency
         keyword_freq = Counter(keywords)
@@ -214,20 +321,8 @@ class ContextAnalyzer:
 
     def _basic_sentiment_analysis(self, words):
         """Basic sentiment analysis using word lists"""
-        positive_words = {
-            'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'positive',
-            'success', 'achievement', 'victory', 'win', 'celebrate', 'happy', 'joy',
-            'love', 'like', 'enjoy', 'pleased', 'satisfied', 'delighted', 'thrilled'
-        }
-        
-        negative_words = {
-            'bad', 'terrible', 'awful', 'horrible', 'negative', 'problem', 'issue',
-            'failure', 'defeat', 'loss', 'sad', 'angry', 'disappointed', 'frustrated',
-            'hate', 'dislike', 'worried', 'concerned', 'crisis', 'disaster', 'tragedy'
-        }
-        
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
+        positive_count = sum(1 for word in words if word in self.positive_words)
+        negative_count = sum(1 for word in words if word in self.negative_words)
         
         total_sentiment_words = positive_count + negative_count
         
@@ -353,7 +448,8 @@ def context_analyzer_menu():
             text = "\n".join(lines[:-1])  # Remove the last empty line
             
             if text.strip():
-                analysis = analyzer.analyze_text(text)
+                with profiler.operation("context_analysis"):
+                    analysis = analyzer.analyze_text(text)
                 analyzer.display_analysis(analysis)
             else:
                 print("No text provided for analysis.")
@@ -365,7 +461,8 @@ def context_analyzer_menu():
                     text = file.read()
                 
                 if text.strip():
-                    analysis = analyzer.analyze_text(text)
+                    with profiler.operation("context_analysis"):
+                        analysis = analyzer.analyze_text(text)
                     analyzer.display_analysis(analysis)
                 else:
                     print("File is empty or contains no readable text.")
@@ -0,0 +1,219 @@
+# corpus_features.py
+# ST1507 CA2 - Batch Corpus Feature Extraction
+# Additional Feature for Newspaper Restoration App
+# Ashley Yong Lok Xi
+# DAAA/2A/03
+
+import csv
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Ashley_Yong_Lok_Xi_2435781.context_analyzer import ContextAnalyzer
+
+_VOWELS = re.compile(r'[aeiouAEIOU]')
+
+
+def _tokenize_chunk(texts):
+    """
+    Worker: tokenize a chunk of documents the way ContextAnalyzer does.
+    Returns the chunk's own vocabulary, its document-term matrix in CSR form
+    (indptr, term ids, counts) and the per-document counts that do not
+    depend on the vocabulary.
+    """
+    analyzer = ContextAnalyzer()
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    counts = []
+    scalars = []
+    for text in texts:
+        words = analyzer._extract_words(analyzer._clean_text(text))
+        for word, count in Counter(words).items():
+            indices.append(vocabulary.setdefault(word, len(vocabulary)))
+            counts.append(count)
+        indptr.append(len(indices))
+        paragraphs = [p for p in text.split('\n\n') if p.strip()]
+        scalars.append((len(text), len(words), len(analyzer._split_sentences(text)), len(paragraphs)))
+    return (list(vocabulary), np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64),
+            np.array(counts, dtype=np.int64), np.array(scalars, dtype=np.int64).reshape(-1, 4))
+
+
+class DocumentTermMatrix:
+    """
+    Sparse document-term count matrix in CSR form over a shared vocabulary:
+    row i holds the terms of document i in indices[indptr[i]:indptr[i+1]]
+    with their counts in data[...].
+    """
+
+    def __init__(self, vocabulary, indptr, indices, data):
+        self.vocabulary = vocabulary  # term -> column
+        self.terms = list(vocabulary)
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = (len(indptr) - 1, len(vocabulary))
+        self._rows = np.repeat(np.arange(self.shape[0]), np.diff(indptr))
+
+    def dot(self, weights):
+        """Matrix product with a dense (terms,) vector or (terms, k) matrix."""
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim == 1:
+            return np.bincount(self._rows, self.data * weights[self.indices], minlength=self.shape[0])
+        return np.column_stack([self.dot(weights[:, j]) for j in range(weights.shape[1])])
+
+    def count_nonzero(self, mask=None):
+        """Distinct terms per document, optionally only those where `mask` is set."""
+        if mask is None:
+            return np.diff(self.indptr)
+        return np.bincount(self._rows, mask[self.indices], minlength=self.shape[0]).astype(np.int64)
+
+    def term_mask(self, words):
+        """Boolean (terms,) vector marking the given words."""
+        mask = np.zeros(self.shape[1], dtype=bool)
+        columns = [self.vocabulary[word] for word in words if word in self.vocabulary]
+        mask[columns] = True
+        return mask
+
+
+class FeatureTable:
+    """
+    Columnar features, one row per document: each column is a NumPy array.
+    The document-term matrix the features came from is kept as `matrix`.
+    """
+
+    def __init__(self, columns, matrix):
+        self.columns = columns
+        self.matrix = matrix
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def row(self, i):
+        """One document's features as a dict of plain Python values."""
+        row = {}
+        for name, column in self.columns.items():
+            value = column[i]
+            row[name] = value.item() if isinstance(value, np.generic) else value
+        return row
+
+    def to_csv(self, filename):
+        with open(filename, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.columns)
+            writer.writerows(zip(*(column.tolist() for column in self.columns.values())))
+
+
+class CorpusFeatureExtractor:
+    """
+    Batch version of ContextAnalyzer for archive-wide analytics. Documents
+    are tokenized in chunks (across a process pool for large corpora) into
+    one sparse document-term matrix over a shared vocabulary; section,
+    sentiment, syllable and keyword counts are then matrix products with
+    per-term weight vectors instead of per-word Python loops.
+
+    Columns match the fields of analyze_text: character/word/sentence/
+    paragraph counts, unique and content words, keyword_count, readability
+    (unrounded, NaN for documents without sentences), section_<name>
+    keyword matches with predicted_section, and sentiment counts with
+    sentiment and sentiment_confidence. Ties between sections go to the
+    first in ContextAnalyzer.section_keywords.
+    """
+
+    def __init__(self, analyzer=None, workers=None, chunk_size=500, parallel_threshold=2000):
+        self.analyzer = analyzer or ContextAnalyzer()
+        self.workers = workers                        # process pool size (None: CPU count)
+        self.chunk_size = chunk_size                  # documents per worker task
+        self.parallel_threshold = parallel_threshold  # smaller corpora stay in-process
+
+    def _tokenize(self, documents):
+        chunks = [documents[i:i + self.chunk_size] for i in range(0, len(documents), self.chunk_size)]
+        if len(documents) < self.parallel_threshold or self.workers == 1:
+            return [_tokenize_chunk(chunk) for chunk in chunks]
+        with ProcessPoolExecutor(self.workers) as pool:
+            return list(pool.map(_tokenize_chunk, chunks))
+
+    def build_matrix(self, documents):
+        """Tokenize `documents` into a DocumentTermMatrix and their (n, 4) scalar counts."""
+        vocabulary = {}
+        indptrs, indices, counts, scalars = [np.zeros(1, dtype=np.int64)], [], [], []
+        offset = 0
+        for chunk_vocabulary, chunk_indptr, chunk_indices, chunk_counts, chunk_scalars in self._tokenize(documents):
+            # Map the chunk's term ids onto the shared vocabulary
+            remap = np.array([vocabulary.setdefault(term, len(vocabulary)) for term in chunk_vocabulary],
+                             dtype=np.int64)
+            indices.append(remap[chunk_indices] if len(chunk_indices) else chunk_indices)
+            counts.append(chunk_counts)
+            indptrs.append(chunk_indptr[1:] + offset)
+            offset += len(chunk_indices)
+            scalars.append(chunk_scalars)
+        matrix = DocumentTermMatrix(
+            vocabulary, np.concatenate(indptrs),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+            np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64))
+        return matrix, (np.concatenate(scalars) if scalars else np.zeros((0, 4), dtype=np.int64))
+
+    def extract(self, documents):
+        """Return a FeatureTable of the features of every document."""
+        analyzer = self.analyzer
+        matrix, scalars = self.build_matrix(list(documents))
+        characters, words, sentences, paragraphs = scalars.T
+        terms = matrix.terms
+
+        stop = matrix.term_mask(analyzer.stop_words)
+        content = ~stop
+        keyword = content & np.array([len(term) > 3 for term in terms], dtype=bool)
+        syllables = np.array([max(1, len(_VOWELS.findall(term))) for term in terms], dtype=np.float64)
+
+        columns = {
+            'character_count': characters,
+            'word_count': words,
+            'sentence_count': sentences,
+            'paragraph_count': paragraphs,
+            'unique_words': matrix.count_nonzero(),
+            'content_words': matrix.dot(content).astype(np.int64),
+            'keyword_count': matrix.count_nonzero(keyword),
+        }
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            readable = (sentences > 0) & (words > 0)
+            sentence_length = np.where(readable, words / sentences, np.nan)
+            syllables_per_word = np.where(readable, matrix.dot(syllables) / words, np.nan)
+        columns['avg_sentence_length'] = sentence_length
+        columns['avg_syllables_per_word'] = syllables_per_word
+        columns['readability_score'] = 206.835 - 1.015 * sentence_length - 84.6 * syllables_per_word
+
+        # Section keyword matches: one indicator column per section
+        sections = list(analyzer.section_keywords)
+        section_weights = np.column_stack([matrix.term_mask(analyzer.section_keywords[section])
+                                           for section in sections])
+        section_matches = matrix.dot(section_weights).astype(np.int64).reshape(len(words), len(sections))
+        for j, section in enumerate(sections):
+            columns[f'section_{section}'] = section_matches[:, j]
+        predicted = np.array(sections, dtype=object)[section_matches.argmax(axis=1)]
+        columns['predicted_section'] = np.where(section_matches.sum(axis=1) > 0, predicted, "unknown")
+
+        # Sentiment: positive and negative indicator counts
+        sentiment_weights = np.column_stack([matrix.term_mask(analyzer.positive_words),
+                                             matrix.term_mask(analyzer.negative_words)])
+        positive, negative = matrix.dot(sentiment_weights).astype(np.int64).reshape(len(words), 2).T
+        total = positive + negative
+        columns['positive_indicators'] = positive
+        columns['negative_indicators'] = negative
+        columns['sentiment'] = np.select([positive > negative, negative > positive],
+                                         ["positive", "negative"], "neutral").astype(object)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns['sentiment_confidence'] = np.where(
+                total == 0, 0.0, np.where(positive == negative, 0.5, np.maximum(positive, negative) / total))
+
+        return FeatureTable(columns, matrix)
+
+
+def extract_corpus_features(documents, workers=None):
+    """Convenience wrapper: FeatureTable for `documents` with default settings."""
+    return CorpusFeatureExtractor(workers=workers).extract(documents)
@@ -4,20 +4,24 @@
 # DAAA/2A/03
 
 from trie import Trie
+from profiling import profiler
 
 class ConfidenceRestorer:
-    def __init__(self, trie: Trie):
+    def __init__(self, trie: Trie, limits=None):
         """
         Initializes the ConfidenceRestorer with a shared Trie instance.
+        `limits` (a SearchLimits) optionally caps each search.
         """
         self.trie = trie
+        self.limits = limits
     
     def restore_with_confidence(self, word_with_wildcards):
         """
         Restores a wildcard word using matches from the trie and shows confidence scores.
         """
-        # Use the wildcard_search method which returns (word, frequency) tuples
-        matches = self.trie.wildcard_search(word_with_wildcards.lower())
+        # Use the wildcard_search method which returns (word, frequency) tuples.
+        # Searching a snapshot keeps this safe while editors change frequencies.
+        matches = self.trie.snapshot().wildcard_search(word_with_wildcards.lower(), self.limits)
         
         if not matches:
             print(f"No matches found for '{word_with_wildcards}'.")
@@ -37,6 +41,9 @@ class ConfidenceRestorer:
         for word, freq in matches:
             confidence = (freq / total_frequency) * 100
             print(f" - {word} ({confidence:.2f}%)")
+        if matches.truncated:
+            print(f"(Search stopped early: showing the best {len(matches)} matches found; "
+                  "confidence scores are relative to these.)")
 
 
     def restore_confidence_menu(self):
@@ -56,7 +63,8 @@ class ConfidenceRestorer:
                 if choice == '1':
                     word_with_wildcards = input("Enter the word with wildcards (e.g., 'c*t'): ").strip()
                     if word_with_wildcards:
-                        self.restore_with_confidence(word_with_wildcards)
+                        with profiler.operation("confidence"):
+                            self.restore_with_confidence(word_with_wildcards)
                     else:
                         print("Invalid input. Please enter a word with wildcards.")
                         
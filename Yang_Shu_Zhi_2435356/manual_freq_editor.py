@@ -3,7 +3,10 @@
 # Contributor: Shu Zhi Yang
 # DAAA/2A/03
 
+import os
+
 from trie import Trie
+from frequency_learner import FrequencyLearner
 
 class ManualFrequencyEditor:
     def __init__(self, trie: Trie):
@@ -21,7 +24,7 @@ class ManualFrequencyEditor:
             return False
 
         word = word.lower().strip()
-        node = self.trie.root
+        node = self.trie.snapshot().root  # a published version, safe to walk during a reload
 
         for char in word:
             if char not in node.children:
@@ -30,8 +33,11 @@ class ManualFrequencyEditor:
             node = node.children[char]
 
         if node.is_terminal:
-            old_freq = node.frequency
-            node.frequency = new_freq
+            # Goes through the trie so the edit is journalled when a journal is attached
+            old_freq = self.trie.set_frequency(word, new_freq)
+            if old_freq is None:
+                print(f"Error: '{word}' not found in trie.")  # deleted since the lookup
+                return False
             print(f"Frequency for '{word}' updated from {old_freq} to {new_freq}.")
             return True
         else:
@@ -42,19 +48,33 @@ class ManualFrequencyEditor:
         """
         Displays all words in the trie with their current frequencies.
         """
-        all_words = self.trie.to_list()
-        if not all_words:
+        # Stream the words alphabetically rather than building and sorting a list
+        items = self.trie.snapshot().iter_items()
+        first = next(items, None)
+        if first is None:
             print("The trie is empty. No frequencies to display.")
             return
-            
+
         print("\n--- Current Word Frequencies ---")
-        # Sort words alphabetically for consistent display
-        all_words.sort(key=lambda item: item[0])
-        for word, freq in all_words:
+        print(f"- {first[0]}: {first[1]}")
+        for word, freq in items:
             print(f"- {word}: {freq}")
         print("--------------------------------")
 
 
+    def learn_frequencies(self, filenames, blend=0.5, min_count=5):
+        """
+        Blends word counts from newspaper text files into the trie's frequencies.
+        """
+        missing = [filename for filename in filenames if not os.path.exists(filename)]
+        if missing:
+            print(f"Error: File '{missing[0]}' not found.")
+            return None
+        result = FrequencyLearner(blend, min_count).learn(self.trie, filenames)
+        print(f"Frequencies learned from {len(filenames)} file(s): "
+              f"{result['updated']} words updated, {result['added']} words added.")
+        return result
+
     def manual_freq_menu(self):
         """
         Displays the menu for manual frequency editing.
@@ -66,10 +86,11 @@ class ManualFrequencyEditor:
                 print("-"*50)
                 print("1. Edit Word Frequency")
                 print("2. Display All Word Frequencies")
-                print("3. Exit to Main Menu")
+                print("3. Learn Frequencies from Text Files")
+                print("4. Exit to Main Menu")
                 print("-"*50)
 
-                choice = input("Enter your choice (1-3): ").strip()
+                choice = input("Enter your choice (1-4): ").strip()
 
                 if choice == '1':
                     word = input("Enter the word to edit frequency: ").strip()
@@ -91,11 +112,25 @@ class ManualFrequencyEditor:
                     self.display_word_frequencies()
                     
                 elif choice == '3':
+                    filenames = [name.strip() for name in
+                                 input("Enter text file(s) to learn from (comma-separated): ").split(',')
+                                 if name.strip()]
+                    if not filenames:
+                        print("Error: No filename entered.")
+                        continue
+                    try:
+                        blend = float(input("Weight of the learned counts, 0-1 (default 0.5): ").strip() or 0.5)
+                        min_count = int(input("Minimum count for adding new words (default 5): ").strip() or 5)
+                        self.learn_frequencies(filenames, blend, min_count)
+                    except ValueError as e:
+                        print(f"Invalid value: {e}")
+
+                elif choice == '4':
                     print("Returning to Main Menu...")
                     break
                     
                 else:
-                    print("Invalid choice. Please enter a number between 1 and 3.")
+                    print("Invalid choice. Please enter a number between 1 and 4.")
                     
             except KeyboardInterrupt:
                 print("\nReturning to Main Menu...")
@@ -0,0 +1,108 @@
+# bitset_index.py
+# ST1507 CA2 - Length-bucketed Positional Bitset Index
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import numpy as np
+
+from trie import SearchResults
+
+
+class _LengthBucket:
+    """All words of one length, most frequent first, with one packed bitset per (position, letter)."""
+
+    def __init__(self, items):
+        self.words = [word for word, freq in items]
+        self.frequencies = np.fromiter((freq for word, freq in items), dtype=np.int64, count=len(items))
+        self.bits = {}
+        length = len(self.words[0])
+        columns = np.array([list(word) for word in self.words], dtype='<U1').reshape(len(self.words), length)
+        for pos in range(length):
+            column = columns[:, pos]
+            for char in np.unique(column):
+                self.bits[(pos, str(char))] = np.packbits(column == char)
+
+    def search(self, pattern):
+        mask = None
+        for pos, char in enumerate(pattern):
+            if char == '*':
+                continue
+            bits = self.bits.get((pos, char))
+            if bits is None:
+                return []
+            mask = bits if mask is None else np.bitwise_and(mask, bits)
+        if mask is None:
+            indices = range(len(self.words))
+        else:
+            indices = np.flatnonzero(np.unpackbits(mask, count=len(self.words)))
+        return [(self.words[i], int(self.frequencies[i])) for i in indices]
+
+
+class LengthBitsetIndex:
+    """
+    Groups a trie's words by length and keeps a bitset per (position, letter).
+    A pattern resolves by AND-ing the bitsets of its known positions; as the
+    rows are stored by descending frequency, the survivors come out ranked
+    the same way Trie.wildcard_search ranks them.
+    """
+
+    def __init__(self, trie):
+        snapshot = trie.snapshot()
+        self.version = snapshot.version
+        by_length = {}
+        # to_list follows the trie's own traversal order, so a stable sort by
+        # frequency reproduces wildcard_search's ordering of ties
+        for word, freq in sorted(snapshot.to_list(), key=lambda x: -x[1]):
+            by_length.setdefault(len(word), []).append((word, freq))
+        self.buckets = {length: _LengthBucket(items) for length, items in by_length.items() if length}
+
+    def wildcard_search(self, pattern):
+        bucket = self.buckets.get(len(pattern))
+        return bucket.search(pattern) if bucket else []
+
+    def best_match(self, pattern):
+        matches = self.wildcard_search(pattern)
+        return matches[0] if matches else None
+
+
+class WildcardQueryPlanner:
+    """
+    Answers wildcard queries from the trie or the bitset index, whichever
+    suits the pattern. The trie prunes well while the pattern starts with
+    known letters; patterns with a leading '*' or mostly wildcards fan out
+    across the top of the trie and are sent to the index instead.
+
+    Presents the Trie search interface, so it can be passed to text_restorer.
+    The index is rebuilt lazily when the trie publishes a new version.
+    """
+
+    def __init__(self, trie, max_known_ratio=0.5):
+        self.trie = trie
+        self.max_known_ratio = max_known_ratio
+        self._index = None
+
+    def snapshot(self):
+        return self
+
+    @property
+    def index(self):
+        if self._index is None or self._index.version != self.trie.snapshot().version:
+            self._index = LengthBitsetIndex(self.trie)
+        return self._index
+
+    def uses_index(self, pattern):
+        if not pattern or '*' not in pattern:
+            return False
+        known = len(pattern) - pattern.count('*')
+        return pattern[0] == '*' or known / len(pattern) <= self.max_known_ratio
+
+    def wildcard_search(self, pattern, limits=None):
+        if not self.uses_index(pattern):
+            return self.trie.snapshot().wildcard_search(pattern, limits)
+        results = SearchResults(self.index.wildcard_search(pattern))
+        # A bitset query costs one AND per known letter, so only max_results applies
+        return limits.finish(results) if limits is not None else results
+
+    def best_match(self, pattern, limits=None):
+        matches = self.wildcard_search(pattern, limits)
+        return matches[0] if matches else None
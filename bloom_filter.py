@@ -0,0 +1,191 @@
+# bloom_filter.py
+# ST1507 CA2 - Bloom Filter for Fast Dictionary Membership
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import hashlib
+import math
+import os
+import struct
+import threading
+
+import numpy as np
+
+_MAGIC = b'BLOOM1\n'
+_HEADER = struct.Struct('<QIQqq')  # bits, hashes, capacity, dictionary size, dictionary mtime
+
+
+def _hash_pairs(words):
+    """Two 32-bit hashes per word, for double hashing (h1 + i*h2)."""
+    digests = b''.join(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest() for word in words)
+    hashes = np.frombuffer(digests, dtype='<u8')
+    return hashes & 0xFFFFFFFF, (hashes >> np.uint64(32)) | np.uint64(1)
+
+
+def _bit_masks(positions):
+    return np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over words, sized for `capacity` words at a
+    false-positive rate of `error_rate`. Words are hashed once with BLAKE2b
+    and the bit positions are worked out for whole batches with NumPy.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size_bits / capacity * math.log(2)))
+        self.bits = np.zeros((self.size_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, words):
+        h1, h2 = _hash_pairs(words)
+        steps = np.arange(self.hash_count, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.size_bits)
+
+    def update(self, words):
+        words = list(words)
+        if words:
+            positions = self._positions(words).ravel()
+            np.bitwise_or.at(self.bits, positions >> np.uint64(3), _bit_masks(positions))
+
+    def add(self, word):
+        self.update((word,))
+
+    def contains_many(self, words):
+        """Boolean array: False means the word is certainly absent."""
+        words = list(words)
+        if not words:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(words)
+        set_bits = self.bits[positions >> np.uint64(3)] & _bit_masks(positions)
+        return set_bits.all(axis=1)
+
+    def __contains__(self, word):
+        return bool(self.contains_many((word,))[0])
+
+
+class TrieBloomFilter:
+    """
+    Bloom filter kept in step with a trie through its edit hooks, like a
+    TrieJournal: added words are set straight away, while a delete or a
+    wholesale replacement marks the filter stale and it is rebuilt from the
+    trie on next use (Bloom filters cannot forget a word).
+
+    It is persisted next to a keyword file as '<keyword file>.bloom',
+    stamped with that file's size and modification time, so a filter saved
+    for an older version of the file is ignored.
+    """
+
+    def __init__(self, trie, error_rate=0.001, headroom=1.5):
+        self.trie = trie
+        self.error_rate = error_rate
+        self.headroom = headroom  # capacity reserved for words added later
+        self.filter = None
+        self.stale = True
+        self._added = 0     # words set since the last rebuild
+        self._pending = []  # added words not yet hashed into the filter
+        self._lock = threading.Lock()
+        trie.bloom = self
+
+    # ---- Trie hooks ----
+
+    def record_set(self, word, freq):
+        # Hashed in one batch on the next query, so bulk edits stay cheap
+        if self.filter is not None and not self.stale:
+            self._pending.append(word)
+            self._added += 1
+            if self._added > self.filter.capacity:
+                self.stale = True  # full: rebuild larger to keep the error rate
+
+    def record_delete(self, word):
+        self.stale = True
+
+    def invalidate(self):
+        self.stale = True
+
+    # ---- Queries ----
+
+    def rebuild(self):
+        words = [word for word, freq in self.trie.snapshot().to_list()]
+        self.filter = BloomFilter(math.ceil(len(words) * self.headroom) + 64, self.error_rate)
+        self.filter.update(words)
+        self._added = len(words)
+        self._pending = []
+        self.stale = False
+
+    def _current(self):
+        """The filter, rebuilt or brought up to date with pending words as needed."""
+        with self._lock:
+            if self.stale:
+                self.rebuild()
+            elif self._pending:
+                pending, self._pending = self._pending, []
+                self.filter.update(pending)
+            return self.filter
+
+    def contains_many(self, words):
+        """Boolean array over `words`: False means the word is certainly not in the trie."""
+        return self._current().contains_many(words)
+
+    def __contains__(self, word):
+        return bool(self.contains_many((word,))[0])
+
+    # ---- Persistence ----
+
+    @staticmethod
+    def _stamp(dictionary_filename):
+        stat = os.stat(dictionary_filename)
+        return stat.st_size, stat.st_mtime_ns
+
+    def save(self, dictionary_filename):
+        """Write the filter to '<dictionary_filename>.bloom'."""
+        bloom = self._current()
+        size, mtime = self._stamp(dictionary_filename)
+        with open(dictionary_filename + ".bloom", 'wb') as file:
+            file.write(_MAGIC)
+            file.write(_HEADER.pack(bloom.size_bits, bloom.hash_count, bloom.capacity, size, mtime))
+            file.write(bloom.bits.tobytes())
+
+    def load(self, dictionary_filename):
+        """
+        Load '<dictionary_filename>.bloom' if it was saved for the current
+        version of the keyword file. Returns True if it was used.
+        """
+        try:
+            with open(dictionary_filename + ".bloom", 'rb') as file:
+                if file.read(len(_MAGIC)) != _MAGIC:
+                    return False
+                size_bits, hash_count, capacity, size, mtime = _HEADER.unpack(file.read(_HEADER.size))
+                if (size, mtime) != self._stamp(dictionary_filename):
+                    return False
+                bits = np.frombuffer(file.read(), dtype=np.uint8).copy()
+        except (OSError, struct.error):
+            return False
+        if len(bits) != (size_bits + 7) // 8:
+            return False
+        bloom = object.__new__(BloomFilter)
+        bloom.capacity, bloom.size_bits, bloom.hash_count, bloom.bits = capacity, size_bits, hash_count, bits
+        with self._lock:
+            self.filter = bloom
+            self._added = self.trie.size
+            self._pending = []
+            self.stale = False
+        return True
+
+
+def attach_bloom_filter(trie, dictionary_filename=None, error_rate=0.001):
+    """
+    Attach a TrieBloomFilter to `trie`, loading the one persisted with
+    `dictionary_filename` when it is up to date and building (and saving)
+    it otherwise.
+    """
+    bloom = TrieBloomFilter(trie, error_rate)
+    if dictionary_filename and not bloom.load(dictionary_filename):
+        try:
+            bloom.save(dictionary_filename)
+        except OSError as e:
+            print(f"Error saving Bloom filter: {e}")
+    return bloom
@@ -0,0 +1,145 @@
+# dictionary_readers.py
+# ST1507 CA2 - Streaming Readers for Compressed and Standard-format Dictionaries
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import bz2
+import gzip
+import lzma
+import os
+
+BLOCK_SIZE = 1 << 20  # bytes of (decompressed) lines parsed per block
+
+
+def _gunzip(raw):
+    return gzip.GzipFile(fileobj=raw)
+
+
+# Compressed files are recognised by extension, and by magic bytes otherwise
+_DECOMPRESSORS = {
+    '.gz': _gunzip,
+    '.bz2': bz2.BZ2File,
+    '.xz': lzma.LZMAFile,
+}
+_MAGIC = (
+    (b'\x1f\x8b', _gunzip),
+    (b'BZh', bz2.BZ2File),
+    (b'\xfd7zXZ\x00', lzma.LZMAFile),
+)
+
+READERS = {}     # format name -> line parser
+EXTENSIONS = {}  # file extension -> format name
+
+
+def register_reader(name, *extensions):
+    """
+    Register a line parser for a dictionary format. The parser is called as
+    parse(line, line_number) with a decoded, stripped, non-empty line and
+    returns (word, frequency), or None to skip the line; it raises
+    ValueError for a malformed line.
+    """
+    def register(parse):
+        READERS[name] = parse
+        for extension in extensions:
+            EXTENSIONS[extension] = name
+        return parse
+    return register
+
+
+@register_reader('csv', '.csv', '.txt')
+def parse_keyword_line(line, line_number):
+    """word,frequency (the app's own keyword files); a bare word has frequency 1."""
+    if ',' not in line:
+        return line, 1
+    parts = line.split(',')
+    word = parts[0].strip()
+    return (word, int(parts[1])) if word else None
+
+
+@register_reader('tsv', '.tsv', '.tab')
+def parse_tsv_line(line, line_number):
+    """word<TAB>count; a bare word has frequency 1."""
+    word, _, count = line.partition('\t')
+    word = word.strip()
+    return (word, int(count) if count.strip() else 1) if word else None
+
+
+@register_reader('dic', '.dic')
+def parse_hunspell_line(line, line_number):
+    """
+    Hunspell .dic: an optional word count on the first line, then one
+    word/FLAGS per line, optionally followed by morphological fields.
+    '\\/' is a literal slash. Every word has frequency 1.
+    """
+    if line_number == 1 and line.isdigit():
+        return None
+    entry = line.split(None, 1)[0]
+    slash = entry.find('/')
+    while slash > 0 and entry[slash - 1] == '\\':
+        slash = entry.find('/', slash + 1)
+    word = entry if slash == -1 else entry[:slash]
+    word = word.replace('\\/', '/')
+    return (word, 1) if word else None
+
+
+def detect_format(filename):
+    """Format name for a file, from its extension once any compression suffix is removed."""
+    base, extension = os.path.splitext(filename.lower())
+    if extension in _DECOMPRESSORS:
+        extension = os.path.splitext(base)[1]
+    return EXTENSIONS.get(extension, 'csv')
+
+
+def _open_decompressed(raw, filename):
+    """Wrap the raw binary file in a streaming decompressor when it is compressed."""
+    decompressor = _DECOMPRESSORS.get(os.path.splitext(filename.lower())[1])
+    if decompressor is None:
+        head = raw.peek(6)[:6]
+        for magic, candidate in _MAGIC:
+            if head.startswith(magic):
+                decompressor = candidate
+                break
+    return decompressor(raw) if decompressor is not None else raw
+
+
+def report_line_error(filename, line_number, line, message):
+    """Default on_error handler: print the problem and carry on."""
+    print(f"Error: '{filename}' line {line_number}: {message} ({line[:40]!r})")
+
+
+def iter_dictionary(filename, format=None, on_error=report_line_error, progress=None):
+    """
+    Yield (word, frequency) pairs from a dictionary file, decompressing
+    .gz/.bz2/.xz files as a stream. `format` names a registered reader
+    (default: detected from the file name). Malformed lines are passed to
+    on_error(filename, line_number, line, message) and skipped.
+    If given, `progress` is called with the bytes of the file read so far
+    (compressed bytes, for compressed files) after each block.
+    """
+    parse = READERS[format or detect_format(filename)]
+    with open(filename, 'rb') as raw:
+        stream = _open_decompressed(raw, filename)
+        try:
+            line_number = 0
+            while True:
+                block = stream.readlines(BLOCK_SIZE)
+                if not block:
+                    break
+                for line in block:
+                    line_number += 1
+                    try:
+                        line = line.decode('utf-8').strip()
+                        if not line:
+                            continue
+                        item = parse(line, line_number)
+                    except ValueError as e:  # includes UnicodeDecodeError
+                        if on_error is not None:
+                            on_error(filename, line_number, str(line).strip(), e)
+                        continue
+                    if item is not None:
+                        yield item
+                if progress is not None:
+                    progress(raw.tell())
+        finally:
+            if stream is not raw:
+                stream.close()
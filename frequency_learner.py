@@ -0,0 +1,126 @@
+# frequency_learner.py
+# ST1507 CA2 - Learn Keyword Frequencies from Newspaper Text
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from trie import Trie
+
+CHUNK_BYTES = 8 << 20  # bytes of text counted per worker task
+
+# Byte table that lowercases letters and blanks out everything else, so a
+# plain split() yields the words. '*' is kept so damaged words can be skipped.
+_KEEP = b"abcdefghijklmnopqrstuvwxyz*"
+_TOKEN_TABLE = bytes(byte if byte in _KEEP else ord(' ')
+                     for byte in bytes(range(256)).lower())
+
+
+def _count_tokens(data):
+    # translate + split is several times faster than a regex over the text
+    counts = Counter(data.translate(_TOKEN_TABLE).split())
+    return Counter({token.decode('ascii'): count for token, count in counts.items() if b'*' not in token})
+
+
+def _count_chunk(filename, start, end):
+    """
+    Worker: count the words of the lines of `filename` that start within
+    bytes [start, end). A line running past `end` is finished here, and the
+    partial line at `start` is left to the previous chunk.
+    """
+    with open(filename, 'rb') as file:
+        if start > 0:
+            file.seek(start - 1)
+            file.readline()  # skip to the first line starting at or after `start`
+        position = file.tell()
+        if position >= end:
+            return Counter()
+        data = file.read(end - position)
+        if data and not data.endswith(b'\n'):
+            data += file.readline()  # finish the line running past `end`
+    return _count_tokens(data)
+
+
+def _chunks(filenames, chunk_bytes):
+    for filename in filenames:
+        size = os.path.getsize(filename)
+        for start in range(0, size, chunk_bytes):
+            yield filename, start, min(start + chunk_bytes, size)
+
+
+class FrequencyLearner:
+    """
+    Learns word frequencies from clean or already restored newspaper text
+    and folds them into a trie's frequencies in one bulk update.
+
+    Text files are split into byte ranges counted in parallel (one process
+    per CPU for large inputs) into Counters, which are summed as they come
+    back. Damaged words containing '*' are ignored.
+
+    Learned counts are blended with the existing frequencies using Trie.merge:
+    by default frequency = (1 - blend) * existing + blend * count, applied to
+    every word, so words the text never uses fade by the same factor.
+    `policy` overrides this with any merge policy ('sum', 'max', 'weighted'
+    with `weights`, or a function). Words not yet in the dictionary are only
+    added if they occur at least `min_count` times.
+    """
+
+    def __init__(self, blend=0.5, min_count=5, policy='weighted', weights=None,
+                 workers=None, chunk_bytes=CHUNK_BYTES):
+        if not 0 <= blend <= 1:
+            raise ValueError("blend must be between 0 and 1")
+        self.blend = blend
+        self.min_count = min_count
+        self.policy = policy
+        self.weights = weights or (1 - blend, blend)
+        self.workers = workers          # process pool size (None: CPU count)
+        self.chunk_bytes = chunk_bytes
+
+    def count_files(self, filenames):
+        """Return a Counter of the words in the given text files."""
+        chunks = list(_chunks(filenames, self.chunk_bytes))
+        counts = Counter()
+        if len(chunks) <= 1 or self.workers == 1:
+            for chunk in chunks:
+                counts.update(_count_chunk(*chunk))
+            return counts
+        with ProcessPoolExecutor(self.workers) as pool:
+            for chunk_counts in pool.map(_count_chunk, *zip(*chunks)):
+                counts.update(chunk_counts)
+        return counts
+
+    def count_texts(self, texts):
+        """Return a Counter of the words in the given strings."""
+        counts = Counter()
+        for text in texts:
+            counts.update(_count_tokens(text.encode('utf-8')))
+        return counts
+
+    def apply(self, trie, counts):
+        """
+        Blend `counts` into the trie's frequencies as one new version.
+        Returns a dict with the number of 'updated' and 'added' words.
+        """
+        view = trie.snapshot()
+        learned = type(trie)()
+        added = 0
+        with learned._writing():
+            for word, count in sorted(counts.items()):
+                if view.search(word):
+                    learned.add(word, count)
+                elif count >= self.min_count:
+                    learned.add(word, count)
+                    added += 1
+        trie.merge(learned, self.policy, self.weights)
+        return {'updated': learned.size - added, 'added': added}
+
+    def learn(self, trie, filenames):
+        """Count the words of the text files and apply them to the trie."""
+        return self.apply(trie, self.count_files(filenames))
+
+
+def learn_frequencies(trie: Trie, filenames, blend=0.5, min_count=5, workers=None):
+    """Convenience wrapper: learn from text files into `trie` with a FrequencyLearner."""
+    return FrequencyLearner(blend, min_count, workers=workers).learn(trie, filenames)
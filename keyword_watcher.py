@@ -0,0 +1,82 @@
+# keyword_watcher.py
+# ST1507 CA2 - Watch a Keyword File and Reload its Changes Incrementally
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import os
+import threading
+
+
+class KeywordFileWatcher:
+    """
+    Polls a keyword file's size and modification time and, when it changes,
+    applies just the differences to the trie with Trie.reload_keywords.
+    A change is only applied once the file has stayed the same for one
+    poll, so a file caught half-rewritten is not mistaken for one with
+    most of its words deleted.
+
+    Polling runs on a daemon thread after start(); check() runs one poll
+    by hand. on_reload(watcher, counts) is called after each reload.
+    """
+
+    def __init__(self, trie, filename, interval=1.0, on_reload=None, format=None):
+        self.trie = trie
+        self.filename = filename
+        self.interval = interval
+        self.on_reload = on_reload
+        self.format = format
+        self.reloads = 0
+        self._applied = self._stamp()  # version of the file the trie matches
+        self._seen = self._applied     # version seen at the last poll
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error watching '{self.filename}': {e}")
+
+    def check(self):
+        """
+        Poll the file once. Returns the reload's edit counts, or None if
+        nothing was applied.
+        """
+        stamp = self._stamp()
+        settled = stamp == self._seen
+        self._seen = stamp
+        if stamp is None or stamp == self._applied or not settled:
+            return None
+        counts = self.trie.reload_keywords(self.filename, self.format)
+        if counts is None:
+            return None
+        self._applied = stamp
+        self.reloads += 1
+        if self.on_reload is not None:
+            self.on_reload(self, counts)
+        return counts
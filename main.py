@@ -3,12 +3,25 @@
 # Shu Zhi and Ashley
 # DAAA/2A/03
 
+import argparse
+
 from newspaper_restoration_app import NewspaperRestorationApp
+from profiling import profiler
 
 if __name__ == "__main__":
     """
     Entry point for the Newspaper Text Restorer application.
     Initializes and runs the app.
     """
+    parser = argparse.ArgumentParser(description="Newspaper Text Restorer")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile every operation with cProfile and tracemalloc")
+    parser.add_argument("--profile-dir", help="directory for profiling results")
+    args = parser.parse_args()
+    if args.profile:
+        profiler.always = True
+    if args.profile_dir:
+        profiler.output_dir = args.profile_dir
+
     app = NewspaperRestorationApp()
-    app.run()
\ No newline at end of file
+    app.run()
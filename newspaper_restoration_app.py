@@ -4,7 +4,12 @@
 # DAAA/2A/03
 
 from trie import Trie
-from text_restorer import restore_all_matches_from_file, restore_best_matches_from_file
+from trie_journal import TrieJournal
+from phrase_trie import PhraseTrie
+from keyword_watcher import KeywordFileWatcher
+from profiling import profiler
+from text_restorer import (restore_all_matches_from_file, restore_best_matches_from_file,
+                           write_match_lattice, scan_unknown_tokens)
 
 import os
 
@@ -17,6 +22,11 @@ from Yang_Shu_Zhi_2435356.manual_freq_editor import ManualFrequencyEditor
 class NewspaperRestorationApp:
     def __init__(self):
         self.__trie = Trie()
+        self.__journal = None
+        self.__load = None  # BackgroundLoad of the keyword file being read, if any
+        self.__watcher = None  # KeywordFileWatcher reloading an edited keyword file, if any
+        self.__keyword_file = None  # keyword file the trie was last loaded from
+        self.__keyword_version = None  # trie version that matches that file exactly
         self.running = True
         self.conf_restorer = ConfidenceRestorer(self.__trie)
         self.freq_editor = ManualFrequencyEditor(self.__trie)
@@ -31,7 +41,7 @@ class NewspaperRestorationApp:
         print("*" + " "*63 + "*")
         print("*"*65)
         print("\n\n")
-        print("Please select your choice ('1','2','3','4','5','6','7'):")
+        print("Please select your choice ('1','2','3','4','5','6','7','P'):")
         print("    1. Construct/Edit Trie")
         print("    2. Predict/Restore Text")
         print("    "+"-"*52)
@@ -42,18 +52,28 @@ class NewspaperRestorationApp:
         print("    6. Trie visualization (Ashley Yong Lok Xi)")
         print("    "+"-"*52)
         print("    7. Exit")
+        print("    "+"-"*52)
+        print("    P. Profile the next operation (cProfile + tracemalloc)")
+        if self.loading():
+            print(f"\n    (Loading '{self.__load.filename}' in the background: {self.__load.fraction:.0%})")
+        if self.__watcher is not None:
+            print(f"\n    (Watching '{self.__watcher.filename}' for changes)")
         
     def construct_edit_trie_menu(self):
         print("\n" + "-"*60)
         print("Construct/Edit Trie Commands:")
-        print("    '+','-','?','#','@','~','=','!','\\'")
+        print("    '+','-','?','%','#','@','~','^','&','=','!','\\'")
         print("-"*60)
         print("    +sunshine       (add a keyword)")
         print("    -moonlight      (delete a keyword)")
+        print("    -*light         (delete all keywords matching a pattern)")
         print("    ?rainbow        (find a keyword)")
+        print("    %rai            (complete a prefix)")
         print("    #               (display Trie)")
         print("    @               (write Trie to file)")
         print("    ~               (read keywords from file to make Trie)")
+        print("    ^               (read keywords from file and journal edits to it)")
+        print("    &               (watch a keyword file and apply its changes as it is edited)")
         print("    =               (write keywords from Trie to file)")
         print("    !               (print instructions)")
         print("    \\               (exit)")
@@ -78,7 +98,10 @@ class NewspaperRestorationApp:
 
                 elif command.startswith('-'):
                     word = command[1:].lower()
-                    if word: 
+                    if word and '*' in word:
+                        deleted = self.__trie.delete_matching(word)
+                        print(f"Deleted {deleted} keyword(s) matching '{word}' from Trie.")
+                    elif word: 
                         if self.__trie.delete(word):
                             print(f"Deleted '{word}' from Trie.")
                         else:
@@ -89,21 +112,31 @@ class NewspaperRestorationApp:
                 elif command.startswith('?'):
                     word = command[1:].lower()
                     if word:
-                        if self.__trie.search(word):
+                        if self.__trie.snapshot().search(word):
                             print(f"'{word}' found in Trie")
                         else:
                             print(f"'{word}' not found in Trie")
                     else:
                         print("Invalid keyword")
 
+                elif command.startswith('%'):
+                    prefix = command[1:].lower()
+                    completions = self.__trie.snapshot().complete(prefix)
+                    if completions:
+                        print(f"Completions for '{prefix}': " +
+                              ", ".join(f"{word}({freq})" for word, freq in completions))
+                    else:
+                        print(f"No keywords start with '{prefix}'.")
+
                 elif command == '#':
                     print("\nCurrent Trie")
-                    self.__trie.display()
+                    # Read a published version: a watched keyword file may be reloading meanwhile
+                    self.__trie.snapshot().display()
 
                 elif command == '@':
                     filename = input("Enter filename to write trie: ").strip()
                     if filename:
-                        self.__trie.write_trie_to_file(filename)
+                        self.__trie.snapshot().write_trie_to_file(filename)
                         print(f"Trie written to file '{filename}'.")
                     else:
                         print("Invalid filename")
@@ -111,14 +144,42 @@ class NewspaperRestorationApp:
                 elif command == '~':
                     filename = input("Enter filename to read keywords: ").strip()
                     if filename:
-                        try:
-                            self.__trie.read_file_keywords(filename)
-                            print(f"Keywords loaded from file '{filename}'.")
-                        except FileNotFoundError:
-                            print(f"Error: File '{filename}' not found.")
+                        self.load_keywords(filename)
                     else:
                         print("Error: No filename entered.")
 
+                elif command == '^':
+                    filename = input("Enter keyword file to journal edits to: ").strip()
+                    if self.loading():
+                        print("Please wait for the keyword file being loaded to finish.")
+                    elif filename and not (os.path.exists(filename) or os.path.exists(filename + ".journal")):
+                        # Opening a journal on a missing file would replace the keywords with an empty dictionary
+                        print(f"Error: File '{filename}' not found.")
+                    elif filename:
+                        self.close_journal()
+                        self.stop_watching()
+                        self.__journal = TrieJournal(self.__trie, filename)
+                        with profiler.operation("trie_load"):
+                            replayed = self.__journal.open()
+                        # A saved Bloom filter would miss the replayed edits, so none is used or saved
+                        self.__keyword_file = None
+                        print(f"Keywords loaded from file '{filename}' ({replayed} journalled edits replayed).")
+                        print(f"Further edits are journalled to '{self.__journal.journal_filename}'.")
+                    else:
+                        print("Error: No filename entered.")
+
+                elif command == '&':
+                    filename = input("Enter keyword file to watch (blank to stop watching): ").strip()
+                    if self.loading():
+                        print("Please wait for the keyword file being loaded to finish.")
+                    elif filename:
+                        self.watch_keywords(filename)
+                    elif self.__watcher is not None:
+                        print(f"Stopped watching '{self.__watcher.filename}'.")
+                        self.stop_watching()
+                    else:
+                        print("No keyword file is being watched.")
+
                 elif command == '=':
                     filename = input("Enter filename to write keywords to: ").strip()
                     if filename:
@@ -145,7 +206,7 @@ class NewspaperRestorationApp:
     def predict_restore_text_menu(self):
         print("-" * 63)
         print("\nPredict/Restore Text Commands:")
-        print("'~', '#', '$', '&', '@', '!', '\'")
+        print("'~', '#', '$', '&', '@', '+', '%', '=', '!', '\'")
         print("-" * 63)
         print("~ : Read keywords from a file to make a new prefix trie")
         print("# : Display the current prefix trie on the screen")
@@ -153,6 +214,9 @@ class NewspaperRestorationApp:
         print("? : Restore a word using the best keyword match")
         print("& : Restore a text using all matching keywords")
         print("@ : Restore a text using the best keyword matches")
+        print("+ : Restore a text using known phrases, then the best keyword matches")
+        print("% : Write the candidate matches of a text as JSON lines")
+        print("= : Flag the words of a text that are not in the dictionary")
         print("! : Print instructions for various commands")
         print("\\ : Exit and return to main menu")
 
@@ -167,28 +231,24 @@ class NewspaperRestorationApp:
                 elif command == '~':
                     filename = input("Enter filename to read keywords: ").strip()
                     if filename:
-                        try:
-                            self.__trie.read_file_keywords(filename)
-                            print(f"Keywords loaded from file '{filename}'.")
-                        except FileNotFoundError:
-                            print(f"Error: File '{filename}' not found.")
+                        self.load_keywords(filename)
                     else:
                         print("Error: No filename entered.")
 
                 elif command == '#':
                     print("\nCurrent Trie")
-                    self.__trie.display()
+                    self.__trie.snapshot().display()
                 
                 elif command.startswith('$'):
                     pattern = command[1:].lower()
                     if pattern:
-                        matches = self.__trie.wildcard_search(pattern)
+                        matches = self.__trie.snapshot().wildcard_search(pattern)
                         print(f"Matches found: {[word for word, freq in matches]}")
                 
                 elif command.startswith('?'):
                     pattern = command[1:].lower()
                     if pattern:
-                        best = self.__trie.best_match(pattern)
+                        best = self.__trie.snapshot().best_match(pattern)
                         print(f"Best match: <{best[0]}>" if best else "No match found.")
             
                 elif command == '&':
@@ -201,12 +261,15 @@ class NewspaperRestorationApp:
                     if save_choice == 'y':
                         output_filename = input("Enter output filename: ").strip()
                         if output_filename:
-                            restore_all_matches_from_file(self.__trie, filename, output_filename)
+                            with profiler.operation("restore_all"):
+                                restore_all_matches_from_file(self.__trie, filename, output_filename)
                         else:
                             print("Invalid output filename. Restored text will be printed to the console.")
-                            restore_all_matches_from_file(self.__trie, filename)
+                            with profiler.operation("restore_all"):
+                                restore_all_matches_from_file(self.__trie, filename)
                     else:
-                        restore_all_matches_from_file(self.__trie, filename)
+                        with profiler.operation("restore_all"):
+                            restore_all_matches_from_file(self.__trie, filename)
 
 
                 elif command == '@':
@@ -219,15 +282,75 @@ class NewspaperRestorationApp:
                     if save_choice == 'y':
                         output_filename = input("Enter output filename: ").strip()
                         if output_filename:
-                            restore_best_matches_from_file(self.__trie, filename, output_filename)
+                            with profiler.operation("restore_best"):
+                                restore_best_matches_from_file(self.__trie, filename, output_filename)
                         else:
                             print("Invalid output filename. Restored text will be printed to the console.")
+                            with profiler.operation("restore_best"):
+                                restore_best_matches_from_file(self.__trie, filename)
+                    else:
+                        with profiler.operation("restore_best"):
                             restore_best_matches_from_file(self.__trie, filename)
+
+                elif command == '+':
+                    phrase_filename = input("Enter phrase file (default phrases.txt): ").strip() or "phrases.txt"
+                    if not os.path.exists(phrase_filename):
+                        print(f"Error: Phrase file '{phrase_filename}' not found.")
+                        continue
+                    filename = input("Enter defect text file: ").strip()
+                    if not os.path.exists(filename):
+                        print(f"Error: Input file '{filename}' not found.")
+                        continue
+                    phrases = PhraseTrie()
+                    phrases.read_file_phrases(phrase_filename)
+
+                    output_filename = None
+                    if input("Save output to a new file? (y/n): ").lower().strip() == 'y':
+                        output_filename = input("Enter output filename: ").strip() or None
+                        if output_filename is None:
+                            print("Invalid output filename. Restored text will be printed to the console.")
+                    with profiler.operation("restore_best"):
+                        restore_best_matches_from_file(self.__trie, filename, output_filename, phrases=phrases)
+
+                elif command == '%':
+                    filename = input("Enter defect text file: ").strip()
+                    if not os.path.exists(filename):
+                        print(f"Error: Input file '{filename}' not found.")
+                        continue
+
+                    output_filename = input("Enter output filename (.jsonl): ").strip()
+                    if output_filename:
+                        with profiler.operation("restore_lattice"):
+                            write_match_lattice(self.__trie, filename, output_filename)
                     else:
-                        restore_best_matches_from_file(self.__trie, filename)
+                        print("Invalid output filename. Lattice will be printed to the console.")
+                        with profiler.operation("restore_lattice"):
+                            write_match_lattice(self.__trie, filename)
+
+                elif command == '=':
+                    filename = input("Enter text file to check: ").strip()
+                    if not os.path.exists(filename):
+                        print(f"Error: Input file '{filename}' not found.")
+                        continue
+
+                    if self.__trie.bloom is None:
+                        # Built once, then kept in step with every edit. It is only saved with the
+                        # keyword file (or loaded from it) while the trie still matches that file
+                        try:
+                            from bloom_filter import attach_bloom_filter
+                        except ImportError:
+                            print("Error: Scanning for unknown words needs NumPy (pip install -r requirements.txt).")
+                            continue
+                        unedited = self.__trie.version == self.__keyword_version
+                        attach_bloom_filter(self.__trie, self.__keyword_file if unedited else None)
+                    output_filename = input("Enter output filename (.jsonl, blank for console): ").strip()
+                    with profiler.operation("scan_unknown"):
+                        flagged = scan_unknown_tokens(self.__trie, filename, output_filename or None)
+                    if not output_filename:
+                        print(f"{flagged} unknown word(s) found.")
 
                 elif command == '#':
-                    for line in self.__trie.display():
+                    for line in self.__trie.snapshot().display():
                         print(line)
                 
                 elif command == '!':
@@ -243,6 +366,106 @@ class NewspaperRestorationApp:
                 print(f"Error: {e}")
 
 
+    def loading(self):
+        """
+        True while a keyword file is being loaded in the background.
+        """
+        return self.__load is not None and self.__load.running
+
+    def load_keywords(self, filename):
+        """
+        Load a keyword file into a fresh trie in the background. The current
+        trie stays usable meanwhile and is swapped over in one step once the
+        whole file has loaded; a failed load leaves it unchanged.
+        """
+        if self.loading():
+            print(f"Still loading '{self.__load.filename}' ({self.__load.fraction:.0%}). Please wait.")
+            return
+        if not os.path.exists(filename):
+            print(f"Error: File '{filename}' not found.")
+            return
+
+        self.close_journal()
+        self.stop_watching()
+        if profiler.pending:
+            # cProfile only sees the calling thread, so profiled loads run here
+            with profiler.operation("trie_load"):
+                self.__trie.read_file_keywords(filename)
+            self.use_saved_bloom_filter(filename)
+            print(f"Keywords loaded from file '{filename}'.")
+            return
+
+        reported = [0]  # last progress step printed, in tenths
+
+        def on_progress(load):
+            step = int(load.fraction * 10)
+            if step > reported[0] and step < 10:
+                reported[0] = step
+                print(f"[load] '{filename}': {step * 10}%")
+
+        def on_done(load):
+            if load.error is None:
+                self.use_saved_bloom_filter(filename)
+                print(f"\n[load] Keywords loaded from file '{filename}' ({self.__trie.size} keywords).")
+            else:
+                print(f"\n[load] Error loading '{filename}': {load.error}. The current keywords are unchanged.")
+
+        self.__load = self.__trie.load_in_background(filename, on_progress, on_done)
+        print(f"Loading keywords from '{filename}' in the background. "
+              "The current keywords stay available until it finishes.")
+
+    def watch_keywords(self, filename):
+        """
+        Load a keyword file, then poll it for changes and apply just the
+        added, deleted and re-weighted words whenever it is rewritten.
+        """
+        if not os.path.exists(filename):
+            print(f"Error: File '{filename}' not found.")
+            return
+        self.close_journal()
+        self.stop_watching()
+        with profiler.operation("trie_load"):
+            self.__trie.read_file_keywords(filename)
+        self.use_saved_bloom_filter(filename)
+
+        def on_reload(watcher, counts):
+            print(f"\n[watch] '{filename}' changed: {counts['add']} added, "
+                  f"{counts['set']} re-weighted, {counts['delete']} deleted.")
+
+        self.__watcher = KeywordFileWatcher(self.__trie, filename, on_reload=on_reload).start()
+        print(f"Keywords loaded from file '{filename}'. Changes to it will be applied as it is edited.")
+
+    def use_saved_bloom_filter(self, filename):
+        """
+        Remember `filename` as the current keyword file and, if a Bloom filter
+        was saved with it ('<file>.bloom'), attach it for unknown-word scans.
+        """
+        self.__keyword_file = filename
+        self.__keyword_version = self.__trie.version
+        if not os.path.exists(filename + ".bloom"):
+            return
+        try:
+            from bloom_filter import attach_bloom_filter
+        except ImportError:
+            return  # NumPy is not installed; scans are unavailable anyway
+        attach_bloom_filter(self.__trie, filename)
+
+    def stop_watching(self):
+        """
+        Stop watching the keyword file, if one is being watched.
+        """
+        if self.__watcher is not None:
+            self.__watcher.stop()
+            self.__watcher = None
+
+    def close_journal(self):
+        """
+        Flush and detach the edit journal, if one is attached.
+        """
+        if self.__journal is not None:
+            self.__journal.close()
+            self.__journal = None
+
     def run(self):
         while True:
             try:
@@ -254,10 +477,8 @@ class NewspaperRestorationApp:
                 elif choice == '2':
                     self.predict_restore_text_menu()
                 elif choice == '3':
-                    self.conf_restorer.trie = self.__trie
                     self.conf_restorer.restore_confidence_menu()
                 elif choice == '4':
-                    self.conf_restorer.trie = self.__trie
                     self.freq_editor.manual_freq_menu()
                 elif choice == '5':
                     print("Additional Feature 3 - Context Analyzer")
@@ -265,13 +486,20 @@ class NewspaperRestorationApp:
                 elif choice == '6':
                     print("Additional Feature 4 - Trie Visualization")
                     integrate_trie_visualizer()
+                elif choice.lower() == 'p':
+                    profiler.arm()
+                    print(f"The next operation will be profiled into '{profiler.output_dir}'.")
                 elif choice == '7':
+                    self.close_journal()
+                    self.stop_watching()
                     print("Thank you for using the Newspaper Restoration Application!")
                     break
                 else:
-                    print("Invalid choice. Please enter a number between 1 and 7.")
+                    print("Invalid choice. Please enter one of '1','2','3','4','5','6','7','P'.")
                     
             except KeyboardInterrupt:
+                self.close_journal()
+                self.stop_watching()
                 print("\nThank you for using the Newspaper Restoration Application!")
                 break
             except Exception as e:
@@ -0,0 +1,140 @@
+# parallel_restorer.py
+# ST1507 CA2 - Thread/Process-parallel Text Restoration
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import itertools
+import os
+import sys
+import sysconfig
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from text_restorer import (_all_matches_token, _best_match_token, _check_policy,
+                           restore_all_matches_from_file, restore_best_matches_from_file)
+
+CHUNK_LINES = 2000  # lines of a document restored per task
+
+_TOKEN_RESTORERS = {'best': _best_match_token, 'all': _all_matches_token}
+_FILE_RESTORERS = {'best': restore_best_matches_from_file, 'all': restore_all_matches_from_file}
+
+_worker_trie = None  # each worker process's own copy of the dictionary
+
+
+def free_threaded():
+    """True on a free-threaded (no-GIL) build with the GIL actually switched off."""
+    if not sysconfig.get_config_var("Py_GIL_DISABLED"):
+        return False
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def choose_executor(executor='auto'):
+    """'auto' picks threads on free-threaded builds and processes otherwise."""
+    if executor == 'auto':
+        return 'thread' if free_threaded() else 'process'
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"Unknown executor: '{executor}'")
+    return executor
+
+
+def _restore_lines(trie, lines, mode, limits, on_truncated):
+    restore_token = _TOKEN_RESTORERS[mode]
+    restored_lines = []
+    for line in lines:
+        restored_lines.append(' '.join(restore_token(trie, w, limits, on_truncated) if '*' in w else w
+                                       for w in line.strip().split()))
+    return restored_lines
+
+
+def _load_worker_trie(trie_class, items):
+    global _worker_trie
+    _worker_trie = trie_class()
+    _worker_trie.from_list(items)
+
+
+def _restore_lines_in_worker(lines, mode, limits, on_truncated):
+    return _restore_lines(_worker_trie, lines, mode, limits, on_truncated)
+
+
+def _restore_file_in_worker(filename, output_filename, mode, limits, on_truncated):
+    _FILE_RESTORERS[mode](_worker_trie, filename, output_filename, limits, on_truncated)
+
+
+def _pool(trie, executor, workers):
+    """
+    A thread pool sharing the trie snapshot, or a process pool whose workers
+    each rebuild the dictionary from its (word, frequency) list.
+    """
+    if executor == 'thread':
+        return ThreadPoolExecutor(workers)
+    return ProcessPoolExecutor(workers, initializer=_load_worker_trie,
+                               initargs=(type(trie), trie.to_list()))
+
+
+def restore_file_parallel(trie, filename, output_filename=None, mode='best', workers=None,
+                          executor='auto', limits=None, on_truncated='best', chunk_lines=CHUNK_LINES):
+    """
+    Restore one document with its lines split across workers; the output is
+    identical to restore_best/all_matches_from_file. Worker threads all read
+    one shared, read-only snapshot of the trie, which only pays off on
+    free-threaded builds; executor='auto' falls back to a process pool on
+    standard builds.
+    """
+    trie = trie.snapshot()
+    workers = workers or os.cpu_count() or 2
+    try:
+        _check_policy(on_truncated)
+        executor = choose_executor(executor)
+        with open(filename, 'r', encoding='utf-8') as f:
+            chunks = iter(lambda: list(itertools.islice(f, chunk_lines)), [])
+            with _pool(trie, executor, workers) as pool:
+                if executor == 'thread':
+                    results = pool.map(lambda lines: _restore_lines(trie, lines, mode, limits, on_truncated),
+                                       chunks)
+                else:
+                    results = pool.map(_restore_lines_in_worker, chunks, itertools.repeat(mode),
+                                       itertools.repeat(limits), itertools.repeat(on_truncated))
+                restored_lines = [line for chunk in results for line in chunk]
+
+        if output_filename:
+            with open(output_filename, 'w', encoding='utf-8') as outfile:
+                for line in restored_lines:
+                    outfile.write(line + '\n')
+            print(f"\nRestored text successfully saved to '{output_filename}'.")
+        else:
+            print(f"\n--- Restored Text ({'Best Matches' if mode == 'best' else 'All Matches'}) ---")
+            for line in restored_lines:
+                print(line)
+            print("--- End of Text ---")
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+def restore_files_parallel(trie, jobs, mode='best', workers=None, executor='auto',
+                           limits=None, on_truncated='best'):
+    """
+    Restore many documents at once, one per task. `jobs` is a list of
+    (input filename, output filename) pairs.
+    """
+    trie = trie.snapshot()
+    workers = workers or os.cpu_count() or 2
+    try:
+        _check_policy(on_truncated)
+        executor = choose_executor(executor)
+        restore_file = _FILE_RESTORERS[mode]
+        with _pool(trie, executor, workers) as pool:
+            if executor == 'thread':
+                futures = [pool.submit(restore_file, trie, filename, output_filename, limits, on_truncated)
+                           for filename, output_filename in jobs]
+            else:
+                futures = [pool.submit(_restore_file_in_worker, filename, output_filename,
+                                       mode, limits, on_truncated)
+                           for filename, output_filename in jobs]
+            for future in futures:
+                future.result()
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
@@ -0,0 +1,149 @@
+# phrase_trie.py
+# ST1507 CA2 - Phrase Trie for Multi-word Names and Fixed Expressions
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import re
+
+from trie import iter_keyword_file, match_case_pattern
+
+# A token splits into leading punctuation, its word (letters and '*') and
+# whatever follows, e.g. '(Heatherthorn's' -> '(', 'Heatherthorn', "'s"
+_TOKEN_PARTS = re.compile(r"([^A-Za-z*]*)([A-Za-z*]*)(.*)", re.DOTALL)
+
+MIN_PHRASE_WORDS = 2  # shorter matches are left to single-word restoration
+
+
+class PhraseNode:
+    __slots__ = ('children', 'is_terminal', 'frequency', 'by_length')
+
+    def __init__(self):
+        self.children = {}  # word id -> child
+        self.is_terminal = False
+        self.frequency = 0
+        self.by_length = None  # word length -> [(word id, child)], built on demand
+
+
+def _matches(pattern, word):
+    return len(pattern) == len(word) and all(p == '*' or p == c for p, c in zip(pattern, word))
+
+
+class PhraseTrie:
+    """
+    Trie over whole words rather than characters: each phrase ("felton
+    mccurlyfeather", "heatherthorn strawberry pie") is a path of integer
+    word ids, so known phrases constrain each other's damaged words.
+
+    restore_tokens() makes one left-to-right pass over a line's tokens.
+    At each position it follows every phrase the tokens can spell: clean
+    words must match exactly (ignoring case and surrounding punctuation)
+    and damaged words must match letter for letter outside their '*'s.
+    The longest phrase found (the most frequent on a tie) fills in all of
+    its wildcards together. Tokens outside any phrase fall back to
+    single-word restoration. Phrases do not span lines.
+    """
+
+    def __init__(self):
+        self.root = PhraseNode()
+        self.size = 0
+        self.word_ids = {}    # word -> id
+        self.vocabulary = []  # id -> word
+
+    def _word_id(self, word):
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = self.word_ids[word] = len(self.vocabulary)
+            self.vocabulary.append(word)
+        return word_id
+
+    def add(self, phrase, freq=1):
+        """Add a phrase (a string of space-separated words, or a list of words)."""
+        words = phrase.lower().split() if isinstance(phrase, str) else [w.lower() for w in phrase]
+        if not words:
+            return
+        node = self.root
+        for word in words:
+            node.by_length = None
+            word_id = self._word_id(word)
+            child = node.children.get(word_id)
+            if child is None:
+                child = node.children[word_id] = PhraseNode()
+            node = child
+        if not node.is_terminal:
+            self.size += 1
+        node.is_terminal = True
+        node.frequency += freq
+
+    def read_file_phrases(self, filename):
+        """
+        Read phrases from a file and add them to the trie.
+        File format: phrase,frequency (one per line); a bare phrase has frequency 1.
+        """
+        try:
+            for phrase, frequency in iter_keyword_file(filename, format='csv'):
+                self.add(phrase, frequency)
+
+        except FileNotFoundError:
+            print(f"Error: File '{filename}' not found.")
+        except Exception as e:
+            print(f"Error reading file: {e}")
+
+    def _candidates(self, node, pattern):
+        """Children of `node` whose word fits `pattern` (lowercase, possibly with '*')."""
+        if '*' not in pattern:
+            child = node.children.get(self.word_ids.get(pattern))
+            return [(pattern, child)] if child is not None else []
+        if node.by_length is None:
+            node.by_length = {}
+            for word_id, child in node.children.items():
+                node.by_length.setdefault(len(self.vocabulary[word_id]), []).append((word_id, child))
+        return [(self.vocabulary[word_id], child) for word_id, child in node.by_length.get(len(pattern), ())
+                if _matches(pattern, self.vocabulary[word_id])]
+
+    def match(self, parts, start):
+        """
+        Best phrase spelled by parts[start:] (each a (prefix, word, suffix)
+        split of a token, or None for a token that cannot be in a phrase).
+        Returns (words, frequency) or None.
+        """
+        best = None
+        stack = [(self.root, start, [])]
+        while stack:
+            node, i, words = stack.pop()
+            if node.is_terminal and len(words) >= MIN_PHRASE_WORDS:
+                if best is None or (len(words), node.frequency) > (len(best[0]), best[1]):
+                    best = (words, node.frequency)
+            if i == len(parts) or parts[i] is None or not node.children:
+                continue
+            for word, child in self._candidates(node, parts[i][1].lower()):
+                stack.append((child, i + 1, words + [word]))
+        return best
+
+    def restore_tokens(self, tokens, restore_token):
+        """
+        Restore a line's tokens: damaged words inside a known phrase are
+        filled in from it, and any other token containing '*' is passed to
+        restore_token(token).
+        """
+        parts = []
+        for token in tokens:
+            prefix, word, suffix = _TOKEN_PARTS.match(token).groups()
+            parts.append((prefix, word, suffix) if word and '*' not in prefix + suffix else None)
+
+        restored = []
+        i = 0
+        while i < len(tokens):
+            found = self.match(parts, i) if parts[i] is not None else None
+            if found is None or not any('*' in parts[j][1] for j in range(i, i + len(found[0]))):
+                token = tokens[i]
+                restored.append(restore_token(token) if '*' in token else token)
+                i += 1
+                continue
+            for j, word in enumerate(found[0], i):
+                prefix, original, suffix = parts[j]
+                if '*' in original:
+                    restored.append(f"{prefix}<{match_case_pattern(original, word)}>{suffix}")
+                else:
+                    restored.append(tokens[j])
+            i += len(found[0])
+        return restored
@@ -0,0 +1,157 @@
+# profiling.py
+# ST1507 CA2 - On-demand Profiling of App Operations
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+_NOT_PROFILING = nullcontext()
+
+
+class OperationProfiler:
+    """
+    Wraps named operations (trie load, restore, confidence, context analysis)
+    with cProfile and tracemalloc when armed, and writes for each one:
+        <label>-<time>-<n>.pstats     (cProfile stats, for pstats/snakeviz)
+        <label>-<time>-<n>.collapsed  (collapsed stacks, for flamegraph.pl/speedscope)
+        <label>-<time>-<n>.alloc.txt  (top allocations and peak traced memory)
+where <n> numbers the profiles written, so operations finishing within
+the same second never overwrite each other's results.
+
+    When disarmed, operation() hands back a shared no-op context manager,
+    so the hooks cost a single attribute check.
+    """
+
+    def __init__(self, output_dir="profiles", always=False, top_allocations=15):
+        self.output_dir = output_dir
+        self.always = always           # profile every operation
+        self.top_allocations = top_allocations
+        self._armed = False            # profile only the next operation
+        self._active = False
+        self._written = 0              # profiles written so far, numbering the result files
+
+    @classmethod
+    def from_env(cls):
+        """
+        NEWSPAPER_PROFILE=1 profiles every operation;
+        NEWSPAPER_PROFILE_DIR sets where the results go.
+        """
+        always = os.environ.get("NEWSPAPER_PROFILE", "").lower() in ("1", "true", "yes", "on")
+        return cls(os.environ.get("NEWSPAPER_PROFILE_DIR", "profiles"), always)
+
+    def arm(self):
+        """Profile the next wrapped operation only."""
+        self._armed = True
+
+    @property
+    def pending(self):
+        """True if the next operation() will be profiled."""
+        return not self._active and (self.always or self._armed)
+
+    def operation(self, label):
+        if self._active or not (self.always or self._armed):
+            return _NOT_PROFILING
+        return self._profile(label)
+
+    @contextmanager
+    def _profile(self, label):
+        self._armed = False
+        self._active = True
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+            self._active = False
+            try:
+                self._write_results(label, profiler, snapshot, peak, elapsed)
+            except OSError as e:
+                print(f"Error writing profile for '{label}': {e}")
+
+    def _write_results(self, label, profiler, snapshot, peak, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        while True:
+            self._written += 1
+            base = os.path.join(self.output_dir, f"{label}-{stamp}-{self._written}")
+            if not os.path.exists(base + ".pstats"):  # e.g. left by an earlier run
+                break
+
+        profiler.dump_stats(base + ".pstats")
+
+        stats = pstats.Stats(profiler).stats
+        with open(base + ".collapsed", 'w', encoding='utf-8') as file:
+            for stack, micros in sorted(_collapsed_stacks(stats).items()):
+                if micros >= 1:
+                    file.write(f"{stack} {int(micros)}\n")
+
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        top = snapshot.statistics('lineno')[:self.top_allocations]
+        with open(base + ".alloc.txt", 'w', encoding='utf-8') as file:
+            file.write(f"Operation: {label}\n")
+            file.write(f"Wall time: {elapsed:.3f} s\n")
+            file.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n\n")
+            file.write(f"Top {len(top)} allocations:\n")
+            for stat in top:
+                file.write(f"{stat}\n")
+
+        print(f"\n[profile] '{label}' took {elapsed:.3f} s, peak traced memory {peak / 1024:.1f} KiB")
+        for stat in top[:5]:
+            print(f"[profile]   {stat}")
+        print(f"[profile] Results written to '{base}.pstats/.collapsed/.alloc.txt'")
+
+
+def _frame_name(func):
+    filename, line, name = func
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def _collapsed_stacks(stats, max_depth=40, min_seconds=1e-6):
+    """
+    Approximate collapsed stacks from cProfile's caller graph: each
+    function's own time is pushed up through its callers, split in
+    proportion to the time each caller spent in it. Returns {stack: microseconds}.
+    """
+    stacks = Counter()
+
+    def walk(func, frames, seconds, seen):
+        callers = stats[func][4]
+        total = sum(info[3] for info in callers.values())
+        if not callers or total <= 0 or len(frames) >= max_depth or seconds < min_seconds:
+            stacks[';'.join(reversed(frames))] += seconds * 1e6
+            return
+        for caller, info in callers.items():
+            share = seconds * info[3] / total
+            if caller in seen or caller not in stats:
+                stacks[';'.join(reversed(frames))] += share * 1e6
+            else:
+                walk(caller, frames + [_frame_name(caller)], share, seen | {caller})
+
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        if tt > 0:
+            walk(func, [_frame_name(func)], tt, {func})
+    return stacks
+
+
+# Shared profiler used by the app, the restorers and the analyzers
+profiler = OperationProfiler.from_env()
@@ -0,0 +1,243 @@
+# radix_trie.py
+# Path-compressed (Radix) Trie for ST1507 CA2
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+from trie import SearchResults, Trie, _frequency_combiner
+
+
+class RadixNode:
+    __slots__ = ('children', 'label', 'is_terminal', 'frequency', 'gen', 'top', '__weakref__')
+
+    def __init__(self, gen=0, label=''):
+        self.children = {}  # first character of the child's label -> child
+        self.label = label  # characters on the edge leading into this node
+        self.is_terminal = False
+        self.frequency = 0
+        self.gen = gen
+        self.top = None
+
+    def copy(self, gen):
+        node = RadixNode(gen, self.label)
+        node.children = dict(self.children)
+        node.is_terminal = self.is_terminal
+        node.frequency = self.frequency
+        return node
+
+
+def _common_prefix_length(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class RadixTrie(Trie):
+    """
+    Trie where chains of single-child, non-terminal nodes are collapsed into
+    one edge label, e.g. 'news' -> 'paper' instead of p-a-p-e-r.
+    Supports the same API as Trie, including copy-on-write snapshots.
+    """
+    node_class = RadixNode
+
+    def _find_node(self, word):
+        node = self.root
+        i = 0
+        while i < len(word):
+            child = node.children.get(word[i])
+            if child is None or not word.startswith(child.label, i):
+                return None
+            i += len(child.label)
+            node = child
+        return node
+
+    @staticmethod
+    def _edge_label(char, child):
+        return child.label
+
+    def _find_prefix(self, prefix):
+        node = self.root
+        word = ''
+        while len(word) < len(prefix):
+            child = node.children.get(prefix[len(word)])
+            if child is None:
+                return None, None
+            # The prefix may end part-way along the last edge
+            if not (prefix.startswith(child.label, len(word)) or
+                    child.label.startswith(prefix[len(word):])):
+                return None, None
+            word += child.label
+            node = child
+        return node, word
+
+    def _writable_path(self, word):
+        """Path-copy the nodes along an existing word; returns them root first."""
+        node = self._writable_root()
+        path = [node]
+        i = 0
+        while i < len(word):
+            node = self._writable_child(node, word[i])
+            i += len(node.label)
+            path.append(node)
+        return path
+
+    def add(self, word, freq=1):
+        with self._writing():
+            node = self._writable_root()
+            i = 0
+            while i < len(word):
+                char = word[i]
+                if char not in node.children:
+                    leaf = self.node_class(self._gen, word[i:])
+                    node.children[char] = leaf
+                    node = leaf
+                    break
+                child = self._writable_child(node, char)
+                common = _common_prefix_length(child.label, word[i:])
+                if common < len(child.label):
+                    # Split the edge where the new word leaves it
+                    middle = self.node_class(self._gen, child.label[:common])
+                    child.label = child.label[common:]
+                    middle.children[child.label[0]] = child
+                    node.children[char] = middle
+                    child = middle
+                node = child
+                i += common
+            if not node.is_terminal:
+                self.size += 1
+            node.is_terminal = True
+            node.frequency += freq
+            self._record_set(word, node.frequency)
+
+    def set_frequency(self, word, freq):
+        node = self._find_node(word)
+        if node is None or not node.is_terminal:
+            return None
+        with self._writing():
+            # Check again under the lock: another writer may have deleted it meanwhile
+            node = self._find_node(word)
+            if node is None or not node.is_terminal:
+                return None
+            node = self._writable_path(word)[-1]
+            old_freq = node.frequency
+            node.frequency = freq
+            self._record_set(word, freq)
+        return old_freq
+
+    def delete(self, word):
+        node = self._find_node(word)
+        if node is None or not node.is_terminal:
+            return False
+        with self._writing():
+            node = self._find_node(word)
+            if node is None or not node.is_terminal:
+                return False
+            path = self._writable_path(word)
+            node = path[-1]
+            node.is_terminal = False
+            node.frequency = 0
+            self.size -= 1
+
+            if len(path) > 1:
+                parent = path[-2]
+                if not node.children:
+                    del parent.children[node.label[0]]
+                    node = parent
+                    parent = path[-3] if len(path) > 2 else None
+                # Re-merge a node left with a single child into that child's edge
+                if parent is not None and not node.is_terminal and len(node.children) == 1:
+                    (child,) = node.children.values()
+                    merged = child.copy(self._gen)
+                    merged.label = node.label + child.label
+                    parent.children[merged.label[0]] = merged
+            self._record_delete(word)
+        return True
+
+    def delete_many(self, words, compact=True):
+        # Radix deletes re-merge edges eagerly, so there is nothing to compact
+        removed = 0
+        with self._writing():
+            for word in set(words):
+                removed += self.delete(word)
+        return removed
+
+    def compact(self):
+        pass
+
+    def _insert_sorted(self, items):
+        for word, freq in items:
+            if self.set_frequency(word, freq) is None:
+                self.add(word, freq)
+
+    def merge(self, other, policy='sum', weights=(1, 1)):
+        # Edge labels of the two tries rarely line up, so merge word by word
+        self._merge_words(other, _frequency_combiner(policy, weights))
+
+    def _wildcard_matches(self, pattern, budget=None):
+        results = SearchResults()
+
+        def dfs(node, i, path):
+            if budget is not None and not budget.spend():
+                return
+            if i == len(pattern):
+                if node.is_terminal:
+                    results.append((path, node.frequency))
+                return
+            if pattern[i] == '*':
+                children = node.children.values()
+            elif pattern[i] in node.children:
+                children = (node.children[pattern[i]],)
+            else:
+                return
+            for child in children:
+                label = child.label
+                end = i + len(label)
+                if end > len(pattern):
+                    continue
+                # '*' matches any character inside the edge label
+                if all(p == '*' or p == c for p, c in zip(pattern[i:end], label)):
+                    dfs(child, end, path + label)
+        dfs(self.root, 0, '')
+        return results
+
+    def _tree_lines(self):
+        lines = []
+
+        def _walk(node, prefix):
+            children = list(node.children.values())
+            for i, child in enumerate(children):
+                is_last = i == len(children) - 1
+                marker = f"* (Frequency: {child.frequency})" if child.is_terminal else ""
+                lines.append(f"{prefix}{'└── ' if is_last else '├── '}{child.label}{marker}")
+                _walk(child, prefix + ("    " if is_last else "│   "))
+        _walk(self.root, "")
+        return lines
+
+    def display(self):
+        """
+        Display the radix trie, one edge label per line.
+        """
+        if not self.root.children:
+            print("[]")
+            return
+        print("Trie Structure:")
+        for line in self._tree_lines():
+            print(line)
+
+    def write_trie_to_file(self, filename):
+        """
+        Write the radix trie structure to a file, one edge label per line.
+        """
+        try:
+            with open(filename, 'w', encoding='utf-8') as file:
+                if self.size == 0:
+                    file.write("[]\n")
+                    return
+                file.write("Trie Structure:\n")
+                for line in self._tree_lines():
+                    file.write(line + "\n")
+                file.write(f"\nTotal words: {self.size}\n")
+
+        except Exception as e:
+            print(f"Error writing trie to file: {e}")
@@ -0,0 +1,237 @@
+# restoration_harness.py
+# ST1507 CA2 - Restoration Load Generator and Golden-output Regression Harness
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import argparse
+import contextlib
+import filecmp
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from trie import SearchLimits, Trie
+from text_restorer import (TRUNCATED_POLICIES, restore_all_matches_from_file, restore_best_matches_from_file,
+                           restore_all_matches_mmap, restore_best_matches_mmap, write_match_lattice)
+
+PIPELINES = {
+    'best': restore_best_matches_from_file,
+    'all': restore_all_matches_from_file,
+    'best_mmap': restore_best_matches_mmap,
+    'all_mmap': restore_all_matches_mmap,
+    'lattice': write_match_lattice,
+}
+
+# (defect file, keyword file, best-match golden, all-matches golden)
+GOLDEN_CASES = [
+    ("post1_defect.txt", "stopwordsFreq.txt", "post1_restored_best.txt", "post1_restored_all.txt"),
+    ("post2_defect.txt", "stopwordsFreq.txt", "post2_restored_best.txt", "post2_restored_all.txt"),
+]
+
+_WORD = re.compile(r'[A-Za-z]+')
+_SIZE = re.compile(r'^(\d+(?:\.\d+)?)\s*([KMG]?)B?$', re.IGNORECASE)
+
+
+def parse_size(text):
+    """Parse sizes such as '64KB', '10MB' or '1GB' into bytes."""
+    match = _SIZE.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid size: '{text}'")
+    number, unit = match.groups()
+    return int(float(number) * {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}[unit.upper()])
+
+
+def inject_damage(line, rng, density=0.1, max_stars=2, length_weights=None):
+    """
+    Replace letters of randomly chosen words with '*'.
+    `density` is the chance a word is damaged; `length_weights` optionally
+    scales that chance by word length, e.g. {3: 0.5, 8: 2.0}.
+    Damage never changes a word's length, so tokens stay aligned with the clean text.
+    """
+    def damage(match):
+        word = match.group()
+        chance = density * (length_weights.get(len(word), 1.0) if length_weights else 1.0)
+        if rng.random() >= chance:
+            return word
+        letters = list(word)
+        for i in rng.sample(range(len(word)), min(len(word), rng.randint(1, max_stars))):
+            letters[i] = '*'
+        return ''.join(letters)
+    return _WORD.sub(damage, line)
+
+
+def generate_corpus(clean_lines, target_bytes, clean_path, defect_path,
+                    density=0.1, max_stars=2, length_weights=None, seed=1507):
+    """
+    Stream a clean corpus of about `target_bytes` (repeating `clean_lines`)
+    and its damaged copy, so corpora from kilobytes to gigabytes never
+    have to fit in memory.
+    """
+    rng = random.Random(seed)
+    written = 0
+    with open(clean_path, 'w', encoding='utf-8') as clean, \
+            open(defect_path, 'w', encoding='utf-8') as defect:
+        while written < target_bytes:
+            for line in clean_lines:
+                clean.write(line + '\n')
+                defect.write(inject_damage(line, rng, density, max_stars, length_weights) + '\n')
+                written += len(line) + 1
+                if written >= target_bytes:
+                    break
+
+
+def best_match_accuracy(clean_path, defect_path, restored_path):
+    """
+    Fraction of damaged tokens whose best-match restoration equals the clean token.
+    """
+    damaged = correct = 0
+    with open(clean_path, encoding='utf-8') as clean, \
+            open(defect_path, encoding='utf-8') as defect, \
+            open(restored_path, encoding='utf-8') as restored:
+        for clean_line, defect_line, restored_line in zip(clean, defect, restored):
+            for original, token, result in zip(clean_line.split(), defect_line.split(),
+                                               restored_line.split()):
+                if '*' in token:
+                    damaged += 1
+                    if result.startswith('<') and result.endswith('>') and result[1:-1] == original:
+                        correct += 1
+    return correct / damaged if damaged else 1.0
+
+
+def run_pipeline(trie, pipeline, defect_path, output_path, measure_memory=True, **options):
+    """
+    Run one restoration pipeline, returning throughput figures.
+    `options` (limits, on_truncated) are passed on to the pipeline.
+    With measure_memory, the pipeline is run a second time under tracemalloc
+    (which would skew the timing) to find the peak memory it allocated.
+    """
+    size = os.path.getsize(defect_path)
+    with open(defect_path, encoding='utf-8') as f:
+        tokens = sum(len(line.split()) for line in f)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        PIPELINES[pipeline](trie, defect_path, output_path, **options)
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if measure_memory:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                PIPELINES[pipeline](trie, defect_path, output_path, **options)
+            peak = (tracemalloc.get_traced_memory()[1] - baseline) / 1024 ** 2
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+    return {
+        'pipeline': pipeline,
+        'bytes': size,
+        'seconds': elapsed,
+        'mb_per_second': size / 1024 ** 2 / elapsed if elapsed else 0.0,
+        'tokens_per_second': tokens / elapsed if elapsed else 0.0,
+        # Peak Python memory allocated by this run alone, over what was already held
+        'peak_mb': peak,
+    }
+
+
+def check_golden():
+    """
+    Re-run the restorers on the hand-checked post files and compare with
+    their golden outputs. Returns True if every output matches.
+    """
+    all_passed = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for defect, keywords, best_golden, all_golden in GOLDEN_CASES:
+            trie = Trie()
+            trie.read_file_keywords(keywords)
+            for restore, golden in ((restore_best_matches_from_file, best_golden),
+                                    (restore_all_matches_from_file, all_golden)):
+                output = os.path.join(tmp, golden)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    restore(trie, defect, output)
+                passed = filecmp.cmp(output, golden, shallow=False)
+                all_passed &= passed
+                print(f"{'PASS' if passed else 'FAIL'}: {defect} -> {golden}")
+    return all_passed
+
+
+def _default_clean_lines():
+    # The golden best-match outputs, with the restoration markers removed
+    lines = []
+    for case in GOLDEN_CASES:
+        with open(case[2], encoding='utf-8') as f:
+            lines.extend(line.rstrip('\n').replace('<', '').replace('>', '') for line in f)
+    return [line for line in lines if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Restoration load generator and regression harness")
+    parser.add_argument("--golden", action="store_true",
+                        help="only check the golden post outputs")
+    parser.add_argument("--clean", help="clean source text (default: the golden post outputs)")
+    parser.add_argument("--keywords", default="stopwordsFreq.txt", help="keyword file for the trie")
+    parser.add_argument("--sizes", default="64KB,1MB,10MB", help="comma-separated corpus sizes")
+    parser.add_argument("--density", type=float, default=0.1, help="chance a word is damaged")
+    parser.add_argument("--max-stars", type=int, default=2, help="most '*' per damaged word")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES), help="pipelines to run")
+    parser.add_argument("--workdir", help="where to write corpora (default: a temporary directory)")
+    parser.add_argument("--max-results", type=int, help="keep at most this many matches per token")
+    parser.add_argument("--max-visits", type=int, help="trie nodes a token's search may visit")
+    parser.add_argument("--timeout", type=float, help="seconds a token's search may take")
+    parser.add_argument("--on-truncated", default="best", choices=TRUNCATED_POLICIES,
+                        help="what to write for tokens whose search hit a limit")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.max_results is not None or args.max_visits is not None or args.timeout is not None:
+        options = {'limits': SearchLimits(args.max_results, args.max_visits, args.timeout),
+                   'on_truncated': args.on_truncated}
+
+    passed = check_golden()
+    if args.golden:
+        return 0 if passed else 1
+
+    if args.clean:
+        with open(args.clean, encoding='utf-8') as f:
+            clean_lines = [line.rstrip('\n') for line in f if line.strip()]
+    else:
+        clean_lines = _default_clean_lines()
+
+    trie = Trie()
+    trie.read_file_keywords(args.keywords)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        print(f"\n{'size':>10} {'pipeline':>10} {'MB/s':>8} {'tokens/s':>12} {'peak mem':>10} {'accuracy':>9}")
+        for size_text in args.sizes.split(','):
+            size = parse_size(size_text)
+            clean_path = os.path.join(workdir, f"clean-{size}.txt")
+            defect_path = os.path.join(workdir, f"defect-{size}.txt")
+            generate_corpus(clean_lines, size, clean_path, defect_path, args.density, args.max_stars)
+            for pipeline in args.pipelines.split(','):
+                output_path = os.path.join(workdir, f"restored-{pipeline}-{size}.txt")
+                result = run_pipeline(trie, pipeline, defect_path, output_path, **options)
+                accuracy = (f"{best_match_accuracy(clean_path, defect_path, output_path):.1%}"
+                            if pipeline.startswith('best') else "-")
+                print(f"{size_text:>10} {pipeline:>10} {result['mb_per_second']:>8.2f} "
+                      f"{result['tokens_per_second']:>12,.0f} {result['peak_mb']:>8.1f}MB {accuracy:>9}")
+                os.remove(output_path)
+            os.remove(clean_path)
+            os.remove(defect_path)
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
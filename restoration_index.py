@@ -0,0 +1,272 @@
+# restoration_index.py
+# ST1507 CA2 - Incremental Re-restoration of an Archive after Dictionary Edits
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import json
+import os
+
+from trie import match_case_pattern
+
+INDEX_VERSION = 1
+
+
+def _stamp(filename):
+    stat = os.stat(filename)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def changed_words(before, after):
+    """
+    Words added, deleted or re-weighted between two versions of a
+    dictionary (e.g. a snapshot taken before some edits and the trie after
+    them), found in one merge pass over both in sorted order.
+    """
+    changed = []
+    ours, theirs = before.snapshot().iter_items(), after.snapshot().iter_items()
+    old, new = next(ours, None), next(theirs, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            changed.append(old[0])
+            old = next(ours, None)
+        elif old is None or new[0] < old[0]:
+            changed.append(new[0])
+            new = next(theirs, None)
+        else:
+            if old[1] != new[1]:
+                changed.append(old[0])
+            old, new = next(ours, None), next(theirs, None)
+    return changed
+
+
+class RestorationIndex:
+    """
+    Remembers, for an archive of restored documents, where each distinct
+    wildcard pattern occurs and which restoration was chosen for it, so a
+    dictionary edit only re-runs the searches it can affect.
+
+    A pattern is a damaged token lowercased, as the restorers search it;
+    its choice is the best match (mode='best') or the ranked list of
+    matches (mode='all'). An edit to a word can only change the choice of
+    patterns of the same length that match that word, and only output
+    files with an occurrence of a pattern whose choice actually changed are
+    rewritten, recomputing just the affected lines.
+
+    Output matches restore_best_matches_from_file or
+    restore_all_matches_from_file without search limits. The index is
+    saved as JSON; each document is stamped with its input file's size and
+    mtime, and a document whose input has changed is restored afresh.
+    """
+
+    def __init__(self, filename, mode='best'):
+        if mode not in ('best', 'all'):
+            raise ValueError(f"Unknown restoration mode: '{mode}'")
+        self.filename = filename
+        self.mode = mode
+        self.documents = {}  # input filename -> {'output': output filename, 'stamp': [size, mtime_ns]}
+        self.patterns = {}   # pattern -> {'choice': ..., 'lines': {input filename: [line numbers]}}
+        self._tree = None    # patterns by length as a character tree, for matching edited words
+
+    # ---- Persistence ----
+
+    @classmethod
+    def load(cls, filename):
+        """Load a saved index, or start an empty one if `filename` does not exist yet."""
+        if not os.path.exists(filename):
+            return cls(filename)
+        with open(filename, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported restoration index version in '{filename}'")
+        index = cls(filename, data['mode'])
+        index.documents = data['documents']
+        index.patterns = data['patterns']
+        return index
+
+    def save(self):
+        temporary = self.filename + ".tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'version': INDEX_VERSION, 'mode': self.mode,
+                       'documents': self.documents, 'patterns': self.patterns}, file)
+        os.replace(temporary, self.filename)  # never leave a half-written index
+
+    # ---- Restoration ----
+
+    def _choose(self, trie, pattern):
+        if self.mode == 'best':
+            match = trie.best_match(pattern)
+            return match[0] if match else None
+        return [word for word, freq in trie.wildcard_search(pattern)]
+
+    def _restore_token(self, token):
+        choice = self.patterns[token.lower()]['choice']
+        if self.mode == 'all':
+            return str([match_case_pattern(token, word) for word in choice])
+        return f"<{match_case_pattern(token, choice)}>" if choice is not None else token
+
+    def _restore_line(self, line):
+        return ' '.join(self._restore_token(w) if '*' in w else w for w in line.strip().split())
+
+    def _forget(self, filename):
+        for pattern in list(self.patterns):
+            lines = self.patterns[pattern]['lines']
+            if lines.pop(filename, None) is not None and not lines:
+                del self.patterns[pattern]
+        self.documents.pop(filename, None)
+        self._tree = None
+
+    def restore(self, trie, filename, output_filename):
+        """
+        Restore a whole document into `output_filename` and index its
+        patterns. Each pattern's choice is recomputed against `trie`; where
+        that changes an indexed choice, the other documents using it are
+        patched too.
+        """
+        trie = trie.snapshot()
+        self._forget(filename)
+        chosen = set()  # patterns whose choice has been computed for this document
+        patches = {}    # other input filename -> line numbers to rewrite
+        with open(filename, 'r', encoding='utf-8') as src, \
+                open(output_filename, 'w', encoding='utf-8') as out:
+            for line_number, line in enumerate(src, 1):
+                for w in line.split():
+                    if '*' not in w:
+                        continue
+                    pattern = w.lower()
+                    if pattern not in chosen:
+                        chosen.add(pattern)
+                        choice = self._choose(trie, pattern)
+                        entry = self.patterns.setdefault(pattern, {'choice': choice, 'lines': {}})
+                        if choice != entry['choice']:
+                            entry['choice'] = choice
+                            for other, lines in entry['lines'].items():
+                                patches.setdefault(other, set()).update(lines)
+                    lines = self.patterns[pattern]['lines'].setdefault(filename, [])
+                    if not lines or lines[-1] != line_number:
+                        lines.append(line_number)
+                out.write(self._restore_line(line) + '\n')
+        self.documents[filename] = {'output': output_filename, 'stamp': _stamp(filename)}
+        for other, line_numbers in patches.items():
+            self._patch(other, line_numbers)
+
+    def _patch(self, filename, line_numbers):
+        """Rewrite only the given lines of a document's output, copying the rest."""
+        output_filename = self.documents[filename]['output']
+        temporary = output_filename + ".tmp"
+        with open(filename, 'r', encoding='utf-8') as src, \
+                open(output_filename, 'r', encoding='utf-8') as old, \
+                open(temporary, 'w', encoding='utf-8') as new:
+            for line_number, (line, restored) in enumerate(zip(src, old), 1):
+                new.write(self._restore_line(line) + '\n' if line_number in line_numbers else restored)
+        os.replace(temporary, output_filename)
+
+    # ---- Incremental updates ----
+
+    def affected_patterns(self, words):
+        """The indexed patterns that match any of `words`."""
+        if self._tree is None:
+            self._tree = {}
+            for pattern in self.patterns:
+                node = self._tree.setdefault(len(pattern), {})
+                for char in pattern:
+                    node = node.setdefault(char, {})
+                node[None] = pattern  # None marks the end of a pattern
+
+        found = set()
+
+        def _match(node, word, i):
+            if i == len(word):
+                if None in node:
+                    found.add(node[None])
+                return
+            for key in ('*', word[i]):
+                child = node.get(key)
+                if child is not None:
+                    _match(child, word, i + 1)
+
+        for word in words:
+            node = self._tree.get(len(word))
+            if node is not None:
+                _match(node, word, 0)
+        return found
+
+    def stale_documents(self):
+        """Indexed documents whose input file has changed (or gone) since it was restored."""
+        stale = []
+        for filename, document in self.documents.items():
+            try:
+                if _stamp(filename) != document['stamp']:
+                    stale.append(filename)
+            except OSError:
+                stale.append(filename)
+        return stale
+
+    def update(self, trie, words):
+        """
+        Bring the archive up to date after edits to `words` in the dictionary:
+        recompute the patterns matching them and patch the outputs where a
+        choice changed. Documents whose input changed are restored afresh.
+        Returns a dict counting the 'patterns' recomputed, 'changed' choices
+        and 'documents' rewritten.
+        """
+        trie = trie.snapshot()
+        stale = self.stale_documents()
+        for filename in stale:
+            if os.path.exists(filename):
+                self.restore(trie, filename, self.documents[filename]['output'])
+            else:
+                self._forget(filename)
+
+        patterns = self.affected_patterns(words)
+        patches = {}  # input filename -> line numbers to rewrite
+        changed = 0
+        for pattern in patterns:
+            entry = self.patterns[pattern]
+            choice = self._choose(trie, pattern)
+            if choice != entry['choice']:
+                entry['choice'] = choice
+                changed += 1
+                for filename, lines in entry['lines'].items():
+                    patches.setdefault(filename, set()).update(lines)
+        for filename, line_numbers in patches.items():
+            self._patch(filename, line_numbers)
+        return {'patterns': len(patterns), 'changed': changed,
+                'documents': len(set(stale) | patches.keys())}
+
+
+def restore_archive(trie, jobs, index_filename, mode='best'):
+    """
+    Restore every (input filename, output filename) pair in `jobs` and save
+    a RestorationIndex of them to `index_filename`.
+    """
+    try:
+        index = RestorationIndex.load(index_filename)
+        if index.mode != mode:
+            index = RestorationIndex(index_filename, mode)
+        for filename, output_filename in jobs:
+            index.restore(trie, filename, output_filename)
+        index.save()
+        print(f"\n{len(jobs)} document(s) restored and indexed in '{index_filename}'.")
+        return index
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+def update_archive(trie, index_filename, words):
+    """
+    Re-restore an indexed archive after the dictionary entries for `words`
+    changed (see changed_words), patching only the affected outputs.
+    """
+    try:
+        index = RestorationIndex.load(index_filename)
+        result = index.update(trie, words)
+        index.save()
+        print(f"\n{result['patterns']} pattern(s) rechecked, {result['changed']} changed, "
+              f"{result['documents']} document(s) rewritten.")
+        return result
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
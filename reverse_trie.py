@@ -0,0 +1,124 @@
+# reverse_trie.py
+# ST1507 CA2 - Reverse (Suffix) Trie for Patterns with Known Endings
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+from trie import SearchResults
+
+
+def plan_direction(pattern):
+    """
+    'reverse' if `pattern` is cheaper to search from its end, else 'forward'.
+    A search branches on every '*' it meets before the first known letter,
+    so the side with fewer wildcards in front of its first known letter
+    wins; on a tie, the side holding the longest run of known letters does.
+    """
+    leading = len(pattern) - len(pattern.lstrip('*'))
+    trailing = len(pattern) - len(pattern.rstrip('*'))
+    if leading == len(pattern) or leading == trailing == 0:
+        return 'forward'
+    if leading != trailing:
+        return 'reverse' if trailing < leading else 'forward'
+    runs = [run for run in pattern.split('*') if run]
+    longest = max(runs, key=len)
+    middle = pattern.index(longest) + len(longest) / 2
+    return 'reverse' if middle > len(pattern) / 2 else 'forward'
+
+
+class ReverseTrieIndex:
+    """
+    A second trie holding every word of a dictionary spelled backwards, so
+    patterns such as '**ing', '*ater' or '*e*s' can be matched from their
+    known ending instead of branching on every leading '*'.
+
+    Attached as `trie.reverse`, it is kept in step through the trie's edit
+    hooks, like a TrieJournal or TrieBloomFilter: set and deleted words are
+    mirrored straight away, and a wholesale replacement (from_list,
+    replace_with, read_file_keywords) rebuilds it when that write is
+    published. Its version is published together with the trie's, so a
+    search only goes through it when it holds exactly the version being
+    searched, and falls back to the forward traversal otherwise.
+
+    Reverse searches return the same matches ranked by frequency, but
+    equally frequent matches may come back in a different order.
+    """
+
+    def __init__(self, trie):
+        self.trie = trie
+        self.reversed = type(trie)()  # same node layout as the dictionary
+        self.searches = {'forward': 0, 'reverse': 0}
+        self.stale = True
+        self._published = (None, None)  # (dictionary version, reverse trie snapshot)
+        trie.reverse = self
+        self.publish(trie)
+
+    # ---- Trie hooks ----
+
+    def record_set(self, word, freq):
+        if not self.stale:
+            word = word[::-1]
+            if self.reversed.set_frequency(word, freq) is None:
+                self.reversed.add(word, freq)
+
+    def record_delete(self, word):
+        if not self.stale:
+            self.reversed.delete(word[::-1])
+
+    def invalidate(self):
+        self.stale = True  # rebuilt in one pass when the write is published
+
+    def publish(self, trie):
+        """Called as the trie publishes a version: publish the matching reverse trie."""
+        if self.stale:
+            self.rebuild(trie)
+        self._published = (trie.version, self.reversed.snapshot())
+
+    def rebuild(self, trie=None):
+        view = (trie or self.trie).snapshot()
+        fresh = type(view)()
+        with fresh._writing():
+            fresh._insert_sorted(sorted((word[::-1], freq) for word, freq in view.to_list()))
+        self.reversed = fresh
+        self.stale = False
+
+    def detach(self):
+        """Stop maintaining the reverse trie and search forwards only."""
+        if self.trie.reverse is self:
+            self.trie.reverse = None
+
+    # ---- Queries ----
+
+    def wildcard_search(self, pattern, version, limits=None):
+        """
+        Search `pattern` through the reverse trie if that is the cheaper
+        direction and it matches dictionary `version`; returns None when the
+        forward traversal should be used instead.
+        """
+        published_version, view = self._published
+        if published_version != version or plan_direction(pattern) != 'reverse':
+            self.searches['forward'] += 1
+            return None
+        self.searches['reverse'] += 1
+        matches = view.wildcard_search(pattern[::-1], limits)
+        results = SearchResults((word[::-1], freq) for word, freq in matches)
+        results.truncated = matches.truncated
+        return results
+
+    def memory_report(self):
+        """Node counts and approximate bytes of the dictionary and of its reverse trie."""
+        forward = self.trie.snapshot()
+        _, reverse = self._published
+        report = {
+            'words': forward.size,
+            'forward_nodes': forward.node_count(),
+            'reverse_nodes': reverse.node_count(),
+            'forward_bytes': forward.memory_usage(),
+            'reverse_bytes': reverse.memory_usage(),
+        }
+        report['overhead'] = report['reverse_bytes'] / report['forward_bytes'] if report['forward_bytes'] else 0.0
+        return report
+
+
+def attach_reverse_trie(trie):
+    """Build a reverse trie for `trie` and route suffix-heavy searches through it."""
+    return ReverseTrieIndex(trie)
@@ -0,0 +1,202 @@
+# sharded_trie.py
+# ST1507 CA2 - Sharded Trie across Worker Processes
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import heapq
+import multiprocessing
+import os
+import threading
+import zlib
+
+from trie import SearchResults, Trie, iter_keyword_file
+
+BATCH_SIZE = 5000  # words sent to a shard per message while loading
+
+
+def _shard_worker(conn):
+    """
+    Worker process loop: owns one Trie and answers requests sent over `conn`.
+    Each request is (operation, args); each reply is (ok, result).
+    """
+    trie = Trie()
+    while True:
+        try:
+            operation, args = conn.recv()
+        except EOFError:
+            break
+        if operation == 'close':
+            conn.send((True, None))
+            break
+        try:
+            if operation == 'clear':
+                trie.from_list([])
+                result = None
+            elif operation == 'add_many':
+                with trie._writing():
+                    for word, freq in args[0]:
+                        trie.add(word, freq)
+                result = None
+            elif operation == 'size':
+                result = trie.size
+            else:
+                result = getattr(trie, operation)(*args)
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+class ShardedTrie:
+    """
+    Dictionary partitioned across worker processes by a hash of each word's
+    first character. Words and patterns with a known first letter go to one
+    shard; patterns starting with '*' are sent to every shard in parallel
+    and the results are merged by frequency.
+
+    Presents the same search interface as Trie (wildcard_search, best_match,
+    search, add, delete, ...), so it can be passed to text_restorer.
+    """
+
+    def __init__(self, shards=None):
+        self.shard_count = shards or os.cpu_count() or 2
+        self._lock = threading.Lock()  # one request/reply cycle at a time
+        self._conns = []
+        self._processes = []
+        for _ in range(self.shard_count):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_worker, args=(child_conn,), daemon=True)
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _shard_for(self, word):
+        if not word:
+            return 0  # the empty word has no first letter; it always lives in shard 0
+        return zlib.crc32(word[0].encode('utf-8')) % self.shard_count
+
+    @staticmethod
+    def _reply(conn):
+        ok, result = conn.recv()
+        if not ok:
+            raise RuntimeError(f"Shard error: {result}")
+        return result
+
+    def _call(self, shard, operation, *args):
+        with self._lock:
+            self._conns[shard].send((operation, args))
+            return self._reply(self._conns[shard])
+
+    def _scatter(self, operation, *args):
+        """Send a request to every shard before collecting any reply."""
+        with self._lock:
+            for conn in self._conns:
+                conn.send((operation, args))
+            return [self._reply(conn) for conn in self._conns]
+
+    def snapshot(self):
+        # Each request is answered by the shards' own published versions
+        return self
+
+    @property
+    def size(self):
+        return sum(self._scatter('size'))
+
+    def add(self, word, freq=1):
+        self._call(self._shard_for(word), 'add', word, freq)
+
+    def search(self, word):
+        return self._call(self._shard_for(word), 'search', word)
+
+    def delete(self, word):
+        return self._call(self._shard_for(word), 'delete', word)
+
+    def delete_many(self, words, compact=True):
+        batches = [[] for _ in range(self.shard_count)]
+        for word in words:
+            batches[self._shard_for(word)].append(word)
+        return sum(self._call(shard, 'delete_many', batch, compact)
+                   for shard, batch in enumerate(batches) if batch)
+
+    def delete_matching(self, pattern, compact=True):
+        if pattern and pattern[0] != '*':
+            return self._call(self._shard_for(pattern), 'delete_matching', pattern, compact)
+        return sum(self._scatter('delete_matching', pattern, compact))
+
+    def set_frequency(self, word, freq):
+        return self._call(self._shard_for(word), 'set_frequency', word, freq)
+
+    def wildcard_search(self, pattern, limits=None):
+        if pattern and pattern[0] != '*':
+            return self._call(self._shard_for(pattern), 'wildcard_search', pattern, limits)
+        # Every shard returns its matches sorted by frequency; merge them
+        results = self._scatter('wildcard_search', pattern, limits)
+        merged = SearchResults(heapq.merge(*results, key=lambda x: -x[1]))
+        if limits is not None:
+            merged = limits.finish(merged)
+            merged.truncated = merged.truncated or any(shard.truncated for shard in results)
+        return merged
+
+    def best_match(self, pattern, limits=None):
+        if pattern and pattern[0] != '*':
+            return self._call(self._shard_for(pattern), 'best_match', pattern, limits)
+        matches = [match for match in self._scatter('best_match', pattern, limits) if match]
+        return max(matches, key=lambda x: x[1]) if matches else None
+
+    def complete(self, prefix, k=10):
+        if prefix:
+            return self._call(self._shard_for(prefix), 'complete', prefix, k)
+        results = self._scatter('complete', prefix, k)
+        return heapq.nsmallest(k, (item for shard in results for item in shard),
+                               key=lambda x: (-x[1], x[0]))
+
+    def to_list(self):
+        words = []
+        for shard_words in self._scatter('to_list'):
+            words.extend(shard_words)
+        return words
+
+    def read_file_keywords(self, filename):
+        """
+        Read keywords from a file and distribute them over the shards.
+        File format: word,frequency (one per line)
+        Clears existing shards before loading new data.
+        """
+        try:
+            self._scatter('clear')
+            batches = [[] for _ in range(self.shard_count)]
+            for word, frequency in iter_keyword_file(filename):
+                shard = self._shard_for(word)
+                batches[shard].append((word, frequency))
+                if len(batches[shard]) >= BATCH_SIZE:
+                    self._call(shard, 'add_many', batches[shard])
+                    batches[shard] = []
+            for shard, batch in enumerate(batches):
+                if batch:
+                    self._call(shard, 'add_many', batch)
+
+        except FileNotFoundError:
+            print(f"Error: File '{filename}' not found.")
+        except Exception as e:
+            print(f"Error reading file: {e}")
+
+    def close(self):
+        """Stop the worker processes."""
+        with self._lock:
+            for conn, process in zip(self._conns, self._processes):
+                if process.is_alive():
+                    try:
+                        conn.send(('close', ()))
+                        conn.recv()
+                    except (EOFError, OSError):
+                        pass
+                conn.close()
+                process.join(timeout=5)
+            self._conns = []
+            self._processes = []
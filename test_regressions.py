@@ -0,0 +1,47 @@
+# test_regressions.py
+# ST1507 CA2 - Regression Tests for Cases the Golden Outputs do not Cover
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import os
+
+from frequency_learner import FrequencyLearner
+from sharded_trie import ShardedTrie
+from trie import Trie
+
+KEYWORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwordsFreq.txt")
+
+
+def test_chunk_boundaries(tmp_path):
+    """
+    FrequencyLearner must count every line once however the text is split
+    into chunks, including chunks that end exactly on a newline.
+    """
+    text = "aaa\nbbb\nccc dd\n\nddd eee\nfff"
+    expected = FrequencyLearner().count_texts([text])
+    path = tmp_path / "text.txt"
+    path.write_text(text, encoding='utf-8')
+    for chunk_bytes in range(1, len(text) + 2):
+        assert FrequencyLearner(workers=1, chunk_bytes=chunk_bytes).count_files([str(path)]) == expected
+
+
+def test_failed_multi_file_load(tmp_path):
+    """A missing file passed to read_files_keywords must leave the current keywords in place."""
+    trie = Trie()
+    trie.read_file_keywords(KEYWORDS)
+    size = trie.size
+    trie.read_files_keywords([KEYWORDS, str(tmp_path / "missing-keywords.txt")])
+    assert trie.size == size
+
+
+def test_sharded_empty_word():
+    """ShardedTrie must handle the empty word like Trie does instead of failing to pick a shard."""
+    with ShardedTrie(shards=2) as trie:
+        trie.add("", 2)
+        trie.add("cat", 3)
+        assert trie.search("")
+        assert trie.set_frequency("", 5) == 2
+        assert trie.wildcard_search("") == [("", 5)]
+        assert trie.delete("")
+        assert not trie.search("")
+        assert trie.size == 1
@@ -3,14 +3,42 @@
 # Shu Zhi and Ashley
 # DAAA/2A/03
 
+import itertools
+import json
+import mmap
+import os
+import re
+import sys
+
 from trie import match_case_pattern
 
-def restore_all_matches_from_file(trie, filename, output_filename=None):
+_WHITESPACE = re.compile(rb'\s')
+_WHITESPACE_BYTES = b' \t\n\r\x0b\x0c'
+_DAMAGED_TOKEN = re.compile(r'\S*\*\S*')
+_SCAN_TOKEN = re.compile(r'[A-Za-z*]+')
+SCAN_BLOCK_LINES = 10000  # lines whose tokens are checked against the filter in one batch
+
+# What restorers write for a token whose search hit a SearchLimits cap:
+#   'best'      the best matches found, as for any other token
+#   'original'  the damaged token, unchanged
+#   'mark'      the best matches found, flagged with a trailing '?'
+TRUNCATED_POLICIES = ('best', 'original', 'mark')
+
+
+def _check_policy(on_truncated):
+    if on_truncated not in TRUNCATED_POLICIES:
+        raise ValueError(f"Unknown truncation policy: '{on_truncated}'")
+
+def restore_all_matches_from_file(trie, filename, output_filename=None, limits=None, on_truncated='best'):
     """
     Reads a file with wildcard words, finds all possible matches in the trie.
     Prints the restored lines or saves them to a file.
+    `limits` (a SearchLimits) caps each token's search; `on_truncated` is one
+    of TRUNCATED_POLICIES.
     """
+    trie = trie.snapshot()  # one consistent dictionary version for the whole file
     try:
+        _check_policy(on_truncated)
         restored_lines = []
         with open(filename, 'r', encoding='utf-8') as f:
             for line in f:
@@ -18,10 +46,7 @@ def restore_all_matches_from_file(trie, filename, output_filename=None):
                 restored_words = []
                 for w in words:
                     if '*' in w:
-                        matches = trie.wildcard_search(w.lower())
-                        # Format matches while preserving original case
-                        matched_words = [match_case_pattern(w, m[0]) for m in matches]
-                        restored_words.append(str(matched_words))
+                        restored_words.append(_all_matches_token(trie, w, limits, on_truncated))
                     else:
                         restored_words.append(w)
                 restored_lines.append(' '.join(restored_words))
@@ -42,26 +67,30 @@ def restore_all_matches_from_file(trie, filename, output_filename=None):
     except Exception as e:
         print(f"An error occurred: {e}")
 
-def restore_best_matches_from_file(trie, filename, output_filename=None):
+def restore_best_matches_from_file(trie, filename, output_filename=None, limits=None, on_truncated='best',
+                                   phrases=None):
     """
     Reads a file with wildcard words, finds the best match for each in the trie.
     Prints the restored lines or saves them to a file.
+    `limits` (a SearchLimits) caps each token's search; `on_truncated` is one
+    of TRUNCATED_POLICIES. With a PhraseTrie as `phrases`, damaged words
+    inside known multi-word phrases are restored from the phrase first.
     """
+    trie = trie.snapshot()  # one consistent dictionary version for the whole file
     try:
+        _check_policy(on_truncated)
         restored_lines = []
         with open(filename, 'r', encoding='utf-8') as f:
             for line in f:
                 words = line.strip().split()
+                if phrases is not None:
+                    restored_lines.append(' '.join(phrases.restore_tokens(
+                        words, lambda w: _best_match_token(trie, w, limits, on_truncated))))
+                    continue
                 restored_words = []
                 for w in words:
                     if '*' in w:
-                        best_match = trie.best_match(w.lower())
-                        if best_match:
-                            # Format the best match and preserve case
-                            restored_word = f"<{match_case_pattern(w, best_match[0])}>"
-                            restored_words.append(restored_word)
-                        else:
-                            restored_words.append(w)  # No match found
+                        restored_words.append(_best_match_token(trie, w, limits, on_truncated))
                     else:
                         restored_words.append(w)
                 restored_lines.append(' '.join(restored_words))
@@ -80,4 +109,286 @@ def restore_best_matches_from_file(trie, filename, output_filename=None):
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
     except Exception as e:
-        print(f"An error occurred: {e}")
\ No newline at end of file
+        print(f"An error occurred: {e}")
+
+def _best_match_token(trie, token, limits=None, on_truncated='best'):
+    if limits is None:
+        best_match = trie.best_match(token.lower())
+        # Format the best match and preserve case; keep the token if nothing matches
+        return f"<{match_case_pattern(token, best_match[0])}>" if best_match else token
+    matches = trie.wildcard_search(token.lower(), limits)
+    if not matches or (matches.truncated and on_truncated == 'original'):
+        return token
+    restored = f"<{match_case_pattern(token, matches[0][0])}>"
+    return restored + '?' if matches.truncated and on_truncated == 'mark' else restored
+
+
+def _all_matches_token(trie, token, limits=None, on_truncated='best'):
+    matches = trie.wildcard_search(token.lower(), limits)
+    if matches.truncated and on_truncated == 'original':
+        return token
+    # Format matches while preserving original case
+    restored = str([match_case_pattern(token, m[0]) for m in matches])
+    return restored + '?' if matches.truncated and on_truncated == 'mark' else restored
+
+
+def _restore_mmap(trie, filename, output_filename, restore_token):
+    """
+    Memory-maps `filename` and copies every byte range without a wildcard
+    straight to the output. Only the whitespace-delimited tokens around each
+    '*' are decoded and looked up, so the original spacing is kept exactly.
+    The output is written to a temporary file and moved into place at the
+    end, so it may be the input file itself.
+    """
+    trie = trie.snapshot()
+    restored = {}  # damaged token -> replacement bytes
+    with open(filename, 'rb') as f:
+        temporary = output_filename + ".tmp" if output_filename else None
+        out = open(temporary, 'wb') if output_filename else sys.stdout.buffer
+        try:
+            if f.seek(0, 2) > 0:  # mmap cannot map an empty file
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)
+                    try:
+                        pos = 0
+                        star = mm.find(b'*')
+                        while star != -1:
+                            start = star
+                            while start > pos and mm[start - 1] not in _WHITESPACE_BYTES:
+                                start -= 1
+                            match = _WHITESPACE.search(mm, star)
+                            end = match.start() if match else len(mm)
+
+                            out.write(view[pos:start])
+                            token = bytes(view[start:end])
+                            if token not in restored:
+                                text = token.decode('utf-8')
+                                restored[token] = restore_token(trie, text).encode('utf-8')
+                            out.write(restored[token])
+                            pos = end
+                            star = mm.find(b'*', pos)
+                        out.write(view[pos:])
+                    finally:
+                        view.release()
+        except BaseException:
+            if output_filename:
+                out.close()
+                os.remove(temporary)
+            raise
+    if output_filename:
+        out.close()
+        os.replace(temporary, output_filename)  # never leave a half-written output
+    else:
+        out.flush()
+
+
+def restore_best_matches_mmap(trie, filename, output_filename=None, limits=None, on_truncated='best'):
+    """
+    Fast path of restore_best_matches_from_file for large, sparsely damaged
+    files: only tokens containing '*' are touched and whitespace is preserved.
+    """
+    try:
+        _check_policy(on_truncated)
+        if not output_filename:
+            print("\n--- Restored Text (Best Matches) ---", flush=True)
+        _restore_mmap(trie, filename, output_filename,
+                      lambda trie, token: _best_match_token(trie, token, limits, on_truncated))
+        if output_filename:
+            print(f"\nRestored text successfully saved to '{output_filename}'.")
+        else:
+            print("\n--- End of Text ---")
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+def restore_all_matches_mmap(trie, filename, output_filename=None, limits=None, on_truncated='best'):
+    """
+    Fast path of restore_all_matches_from_file for large, sparsely damaged
+    files: only tokens containing '*' are touched and whitespace is preserved.
+    """
+    try:
+        _check_policy(on_truncated)
+        if not output_filename:
+            print("\n--- Restored Text (All Matches) ---", flush=True)
+        _restore_mmap(trie, filename, output_filename,
+                      lambda trie, token: _all_matches_token(trie, token, limits, on_truncated))
+        if output_filename:
+            print(f"\nRestored text successfully saved to '{output_filename}'.")
+        else:
+            print("\n--- End of Text ---")
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+def _lattice_candidates(trie, token, max_candidates, limits, on_truncated):
+    """The JSON fields holding a token's ranked candidates, with frequencies and confidences."""
+    matches = trie.wildcard_search(token.lower(), limits)
+    truncated = matches.truncated
+    if truncated and on_truncated == 'original':
+        matches = []
+    # Confidences are shares of every match's frequency, before any cut-off
+    total = sum(freq for word, freq in matches)
+    if max_candidates is not None:
+        matches = matches[:max_candidates]
+    candidates = json.dumps([
+        {"word": match_case_pattern(token, word), "frequency": freq,
+         "confidence": round(freq / total, 6) if total else 0.0}
+        for word, freq in matches
+    ], ensure_ascii=False, separators=(',', ':'))
+    return f'"candidates":{candidates},"truncated":true' if truncated else f'"candidates":{candidates}'
+
+
+def write_match_lattice(trie, filename, output_filename=None, max_candidates=None,
+                        limits=None, on_truncated='best'):
+    """
+    Streams the candidate lattice of a damaged text as JSON lines, one record
+    per token containing '*':
+        {"line":3,"start":10,"end":15,"pattern":"c*ild","candidates":[
+            {"word":"child","frequency":120,"confidence":0.923077}, ...]}
+    `line` counts from 1; `start`/`end` are character offsets within the line
+    (end exclusive). Candidates are ranked as wildcard_search ranks them and
+    confidences are shares of the total frequency of all matches, so keeping
+    only `max_candidates` of them does not change their confidences.
+    Each distinct token is looked up and serialised once.
+    Tokens whose search hit a `limits` cap also get "truncated":true; with
+    on_truncated='original' their candidate list is left empty.
+    """
+    trie = trie.snapshot()
+    candidates = {}  # damaged token -> serialised candidate fields
+    try:
+        _check_policy(on_truncated)
+        with open(filename, 'r', encoding='utf-8') as f:
+            out = open(output_filename, 'w', encoding='utf-8') if output_filename else sys.stdout
+            try:
+                for line_number, line in enumerate(f, 1):
+                    if '*' not in line:
+                        continue
+                    for match in _DAMAGED_TOKEN.finditer(line):
+                        token = match.group()
+                        if token not in candidates:
+                            candidates[token] = _lattice_candidates(trie, token, max_candidates,
+                                                                    limits, on_truncated)
+                        out.write(f'{{"line":{line_number},"start":{match.start()},"end":{match.end()},'
+                                  f'"pattern":{json.dumps(token, ensure_ascii=False)},'
+                                  f'{candidates[token]}}}\n')
+            finally:
+                if output_filename:
+                    out.close()
+                else:
+                    out.flush()
+        if output_filename:
+            print(f"\nMatch lattice successfully saved to '{output_filename}'.")
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+def load_lattice(filename):
+    """
+    Yield the records of a lattice written by write_match_lattice as dicts.
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def scan_unknown_tokens(trie, filename, output_filename=None, verify=True):
+    """
+    Flags every word of a text that is not in the dictionary, streaming one
+    JSON record per occurrence: {"line":3,"start":10,"end":15,"token":"Teh"}.
+    Distinct words are checked in batches against the trie's Bloom filter
+    (trie.bloom, or one built for this scan): words it rejects are certainly
+    unknown and never touch the trie. Words it accepts are confirmed with
+    trie.search, so the few unknown words the filter lets through (about
+    its error rate) are flagged too; verify=False skips that check and
+    takes them as known, trading those misses for speed.
+    Damaged tokens containing '*' are left to the restorers.
+    Returns the number of unknown occurrences.
+    """
+    from bloom_filter import TrieBloomFilter  # NumPy is only needed for scans
+
+    trie = trie.snapshot()
+    bloom = trie.bloom if trie.bloom is not None else TrieBloomFilter(trie)
+    known = {}  # lower-cased word -> in the dictionary
+    flagged = 0
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            out = open(output_filename, 'w', encoding='utf-8') if output_filename else sys.stdout
+            try:
+                line_number = 0
+                while True:
+                    lines = list(itertools.islice(f, SCAN_BLOCK_LINES))
+                    if not lines:
+                        break
+                    line_words = [_SCAN_TOKEN.findall(line.lower()) for line in lines]
+                    new_words = set().union(*line_words) - known.keys()
+                    for word in [word for word in new_words if '*' in word]:
+                        known[word] = True  # damaged, not unknown
+                        new_words.discard(word)
+                    new_words = list(new_words)
+                    for word, maybe in zip(new_words, bloom.contains_many(new_words)):
+                        known[word] = bool(maybe) and (not verify or trie.search(word))
+
+                    # Offsets are only worked out for the lines with an unknown word
+                    for line, words in zip(lines, line_words):
+                        line_number += 1
+                        if all(known[word] for word in words):
+                            continue
+                        for match in _SCAN_TOKEN.finditer(line):
+                            if not known[match.group().lower()]:
+                                flagged += 1
+                                out.write(f'{{"line":{line_number},"start":{match.start()},'
+                                          f'"end":{match.end()},"token":{json.dumps(match.group())}}}\n')
+            finally:
+                if output_filename:
+                    out.close()
+                else:
+                    out.flush()
+        if output_filename:
+            print(f"\n{flagged} unknown word(s) saved to '{output_filename}'.")
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    return flagged
+
+
+def complete_prefixes_from_file(trie, filename, output_filename=None, k=5):
+    """
+    Reads one prefix per line and lists the k most frequent completions of each.
+    Prints the completions or saves them to a file.
+    """
+    trie = trie.snapshot()
+    try:
+        completed_lines = []
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                prefix = line.strip()
+                if prefix:
+                    completions = trie.complete(prefix.lower(), k)
+                    words = [match_case_pattern(prefix, word) for word, freq in completions]
+                    completed_lines.append(f"{prefix}: {', '.join(words)}")
+
+        if output_filename:
+            with open(output_filename, 'w', encoding='utf-8') as outfile:
+                for line in completed_lines:
+                    outfile.write(line + '\n')
+            print(f"\nCompletions successfully saved to '{output_filename}'.")
+        else:
+            print("\n--- Prefix Completions ---")
+            for line in completed_lines:
+                print(line)
+            print("--- End of Completions ---")
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+    except Exception as e:
+        print(f"An error occurred: {e}")
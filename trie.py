@@ -3,54 +3,421 @@
 # Shu Zhi and Ashley
 # DAAA/2A/03
 
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+
+from dictionary_readers import iter_dictionary, report_line_error
+
+# Write epochs shared by every trie. A node may only be changed in place by
+# the epoch that created it; anything older may be shared with a snapshot.
+_epochs = itertools.count(1)
+
+# Completion lists cached per node: how many entries, and how deep in the
+# trie nodes keep them. Deeper subtrees are small enough to scan on demand.
+COMPLETION_CACHE_SIZE = 10
+COMPLETION_CACHE_DEPTH = 3
+
+
 class TrieNode:
-    def __init__(self):
+    __slots__ = ('children', 'is_terminal', 'frequency', 'gen', 'top', '__weakref__')
+
+    def __init__(self, gen=0):
         self.children = {}
         self.is_terminal = False
         self.frequency = 0
+        self.gen = gen  # write epoch that owns this node
+        self.top = None  # cached best completions below this node, if built
+
+    def copy(self, gen):
+        node = TrieNode(gen)
+        node.children = dict(self.children)
+        node.is_terminal = self.is_terminal
+        node.frequency = self.frequency
+        return node
+
+
+class _WriteScope:
+    """Holds a trie's write lock; the outermost scope publishes on exit."""
+    __slots__ = ('trie',)
+
+    def __init__(self, trie):
+        self.trie = trie
+
+    def __enter__(self):
+        self.trie._write_lock.acquire()
+        self.trie._write_depth += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        trie = self.trie
+        try:
+            trie._write_depth -= 1
+            if trie._write_depth == 0:
+                trie._publish()
+        finally:
+            trie._write_lock.release()
+
+
+class SearchResults(list):
+    """
+    (word, frequency) matches, most frequent first. `truncated` is True when
+    a SearchLimits cap stopped the search or cut the list short.
+    """
+    truncated = False
+
+
+class SearchLimits:
+    """
+    Caps on a single wildcard search, so one heavily damaged token cannot
+    stall a whole batch:
+        max_results  keep only this many of the best matches
+        max_visits   stop after visiting this many trie nodes
+        timeout      stop after this many seconds
+    A search stopped by max_visits or timeout returns the best matches
+    found so far.
+    """
+
+    def __init__(self, max_results=None, max_visits=None, timeout=None):
+        self.max_results = max_results
+        self.max_visits = max_visits
+        self.timeout = timeout
+
+    def budget(self):
+        """Start the visit budget and clock for one search."""
+        return _SearchBudget(self)
+
+    def finish(self, results, budget=None):
+        """Rank `results` by frequency, keep the best max_results and flag truncation."""
+        results.sort(key=lambda x: -x[1])  # stable, so ties keep traversal order
+        truncated = budget is not None and budget.exhausted
+        if self.max_results is not None and len(results) > self.max_results:
+            del results[self.max_results:]
+            truncated = True
+        results.truncated = truncated
+        return results
+
+
+class _SearchBudget:
+    __slots__ = ('visits', 'max_visits', 'deadline', 'exhausted')
+
+    CLOCK_EVERY = 256  # node visits between deadline checks
+
+    def __init__(self, limits):
+        self.visits = 0
+        self.max_visits = limits.max_visits
+        self.deadline = time.perf_counter() + limits.timeout if limits.timeout is not None else None
+        self.exhausted = False
+
+    def spend(self):
+        """Count one node visit; returns False once the budget has run out."""
+        if self.exhausted:
+            return False
+        self.visits += 1
+        if self.max_visits is not None and self.visits > self.max_visits:
+            self.exhausted = True
+        elif (self.deadline is not None and self.visits % self.CLOCK_EVERY == 0
+              and time.perf_counter() > self.deadline):
+            self.exhausted = True
+        return not self.exhausted
+
+
+class BackgroundLoad:
+    """
+    A keyword file being loaded into a fresh trie on a worker thread; the
+    target trie is swapped over only if the whole file loads. Progress is
+    reported as on_progress(load) and completion as on_done(load), both
+    called from the worker thread.
+    """
+
+    def __init__(self, trie, filename, on_progress=None, on_done=None):
+        self.trie = trie
+        self.filename = filename
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.bytes_read = 0
+        self.total_bytes = 0
+        self.error = None  # the exception that stopped the load, if any
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def fraction(self):
+        """Share of the file read so far, from 0.0 to 1.0."""
+        if not self.total_bytes:
+            return 0.0 if self.running else 1.0
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Wait for the load to finish; returns True if it was swapped in."""
+        self._thread.join(timeout)
+        return not self.running and self.error is None
+
+    def _progress(self, bytes_read):
+        self.bytes_read = bytes_read
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    def _run(self):
+        try:
+            self.total_bytes = os.path.getsize(self.filename)
+            fresh = type(self.trie)()
+            with fresh._writing():
+                for word, frequency in iter_keyword_file(self.filename, self._progress):
+                    fresh.add(word, frequency)
+            self.trie.replace_with(fresh)
+        except Exception as e:
+            self.error = e
+        if self.on_done is not None:
+            self.on_done(self)
 
 
 class Trie:
+    node_class = TrieNode
+
     def __init__(self):
-        self.root = TrieNode()
+        self._gen = next(_epochs)
+        self.root = self.node_class(self._gen)
         self.size = 0
+        self.version = 0
+        self.journal = None  # optional TrieJournal recording every edit
+        self.bloom = None    # optional TrieBloomFilter kept in step with every edit
+        self.reverse = None  # optional ReverseTrieIndex of the reversed words
 
-    def add(self, word, freq=1):
+        self._frozen = False
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._published = (self.root, self.size, self.version)
+        self._gen = next(_epochs)  # the published root now belongs to readers
+
+    # ---- Copy-on-write versions ----
+
+    def snapshot(self):
+        """
+        Return an immutable view of the latest published version.
+        Taking a snapshot is lock-free and O(1); searching it needs no locks
+        because writers never change a published node, they path-copy it.
+        A version is freed as soon as its last snapshot is dropped.
+        """
+        if self._frozen:
+            return self
+        root, size, version = self._published
+        view = object.__new__(type(self))
+        view.root = root
+        view.size = size
+        view.version = version
+        view.journal = None
+        view.bloom = self.bloom
+        view.reverse = self.reverse
+        view._frozen = True
+        return view
+
+    def _writing(self):
+        """
+        Serialise writers and publish the new version when the outermost
+        write finishes.
+        """
+        if self._frozen:
+            raise TypeError("Trie snapshots are read-only")
+        return _WriteScope(self)
+
+    def _publish(self):
+        self.version += 1
+        self._published = (self.root, self.size, self.version)
+        self._gen = next(_epochs)
+        if self.reverse is not None:
+            self.reverse.publish(self)
+        if self.journal is not None:
+            self.journal.maybe_compact()
+
+    def _writable_root(self):
+        if self.root.gen != self._gen:
+            self.root = self.root.copy(self._gen)
+        self.root.top = None
+        return self.root
+
+    def _writable_child(self, node, char):
+        """
+        Return node's child for `char`, creating or path-copying it as needed.
+        Every write goes through here, so it also drops the cached completions
+        of the nodes along the written path.
+        """
+        child = node.children.get(char)
+        if child is None:
+            child = node.children[char] = self.node_class(self._gen)
+        elif child.gen != self._gen:
+            child = node.children[char] = child.copy(self._gen)
+        child.top = None
+        return child
+
+    # ---- Journal, Bloom filter and reverse trie hooks ----
+
+    def _record_set(self, word, freq):
+        """Notify the attached journal and indexes that `word` now has frequency `freq`."""
+        if self.journal is not None:
+            self.journal.record_set(word, freq)
+        if self.bloom is not None:
+            self.bloom.record_set(word, freq)
+        if self.reverse is not None:
+            self.reverse.record_set(word, freq)
+
+    def _record_delete(self, word):
+        """Notify the attached journal and indexes that `word` has been removed."""
+        if self.journal is not None:
+            self.journal.record_delete(word)
+        if self.bloom is not None:
+            self.bloom.record_delete(word)
+        if self.reverse is not None:
+            self.reverse.record_delete(word)
+
+    def _record_reset(self):
+        """Notify the attached journal and indexes that the whole trie has been replaced."""
+        if self.journal is not None:
+            self.journal.record_reset()
+        if self.bloom is not None:
+            self.bloom.invalidate()
+        if self.reverse is not None:
+            self.reverse.invalidate()
+
+    def _find_node(self, word):
         node = self.root
         for char in word:
             if char not in node.children:
-                node.children[char] = TrieNode()
+                return None
             node = node.children[char]
-        if not node.is_terminal:
-            self.size += 1  # only increment if it's a new word
-        node.is_terminal = True
-        node.frequency += freq
+        return node
+
+    def add(self, word, freq=1):
+        with self._writing():
+            node = self._writable_root()
+            gen = self._gen
+            for char in word:
+                # Inlined _writable_child: this loop dominates keyword loading
+                child = node.children.get(char)
+                if child is None:
+                    child = node.children[char] = self.node_class(gen)
+                elif child.gen != gen:
+                    child = node.children[char] = child.copy(gen)
+                child.top = None
+                node = child
+            if not node.is_terminal:
+                self.size += 1  # only increment if it's a new word
+            node.is_terminal = True
+            node.frequency += freq
+            self._record_set(word, node.frequency)
+
+    def set_frequency(self, word, freq):
+        """
+        Set the frequency of an existing word.
+        Returns the old frequency, or None if `word` is not in the trie.
+        """
+        node = self._find_node(word)
+        if node is None or not node.is_terminal:
+            return None
+        with self._writing():
+            # Check again under the lock: another writer may have deleted it meanwhile
+            node = self._find_node(word)
+            if node is None or not node.is_terminal:
+                return None
+            node = self._writable_root()
+            for char in word:
+                node = self._writable_child(node, char)
+            old_freq = node.frequency
+            node.frequency = freq
+            self._record_set(word, freq)
+        return old_freq
 
     def search(self, word):
-        node = self.root
-        for char in word:
-            if char not in node.children:
-                return False
-            node = node.children[char]
-        return node.is_terminal
+        node = self._find_node(word)
+        return node is not None and node.is_terminal
 
     def delete(self, word):
-        def _delete(node, word, depth):
-            if depth == len(word):
-                if node.is_terminal:
-                    node.is_terminal = False
-                    node.frequency = 0
-                    return len(node.children) == 0
+        """
+        Delete a word. Returns True if it was in the trie.
+        """
+        return self.delete_many([word]) == 1
+
+    def delete_many(self, words, compact=True):
+        """
+        Delete many words in one sorted traversal, sharing the walk down any
+        common prefix. Deleted words are tombstoned (unmarked) in place and,
+        unless compact=False, the emptied branches are pruned afterwards.
+        Returns the number of words deleted.
+        """
+        removed = 0
+        with self._writing():
+            path = [self._writable_root()]  # writable nodes along `reached`
+            reached = ''
+            for word in sorted(set(words)):
+                common = 0
+                while common < min(len(reached), len(word)) and reached[common] == word[common]:
+                    common += 1
+                del path[common + 1:]
+                reached = word[:common]
+
+                node = path[-1]
+                for char in word[common:]:
+                    if char not in node.children:
+                        break
+                    node = self._writable_child(node, char)
+                    path.append(node)
+                    reached += char
                 else:
-                    return False
-            char = word[depth]
-            if char in node.children:
-                can_delete = _delete(node.children[char], word, depth + 1)
-                if can_delete:
-                    del node.children[char]
-                    return not node.is_terminal and len(node.children) == 0
-            return False
-        return _delete(self.root, word, 0)
+                    if node.is_terminal:
+                        node.is_terminal = False
+                        node.frequency = 0
+                        self.size -= 1
+                        removed += 1
+                        self._record_delete(word)
+            if compact and removed:
+                self._compact(touched_only=True)
+        return removed
+
+    def delete_matching(self, pattern, compact=True):
+        """
+        Delete every word matching a wildcard pattern such as '*ing'.
+        Returns the number of words deleted.
+        """
+        return self.delete_many([word for word, freq in self.wildcard_search(pattern)], compact)
+
+    def compact(self):
+        """
+        Prune branches left without any words by earlier tombstoned deletes.
+        """
+        with self._writing():
+            self._compact(touched_only=False)
+
+    def _compact(self, touched_only):
+        # Nodes written in this epoch are the only ones a delete can have
+        # emptied, so after a bulk delete only they need to be visited.
+        def _compacted(node):
+            changed = {}
+            for char, child in node.children.items():
+                if touched_only and child.gen != self._gen:
+                    continue
+                new_child = _compacted(child)
+                if new_child is not child:
+                    changed[char] = new_child
+            if changed:
+                if node.gen != self._gen:
+                    node = node.copy(self._gen)
+                node.top = None
+                for char, new_child in changed.items():
+                    if new_child is None:
+                        del node.children[char]
+                    else:
+                        node.children[char] = new_child
+            return node if node.is_terminal or node.children else None
+
+        root = _compacted(self.root)
+        self.root = root if root is not None else self.node_class(self._gen)
 
     def display(self):
         """
@@ -111,24 +478,327 @@ class Trie:
             _display_node(child_node, "    " if is_last_child else "│   ", is_last_child)
 
     def to_list(self):
-        def _collect(node, prefix):
-            words = []
-            if node.is_terminal:
-                words.append((prefix, node.frequency))
+        return list(self._subtree_items(self.root, ''))
+
+    def iter_items(self, prefix='', order='lex', lo=None, hi=None):
+        """
+        Lazily yield (word, frequency) pairs below `prefix`, restricted to
+        lo <= word < hi when given.
+        order='lex' walks children in sorted order; order='freq' yields the
+        most frequent words first (ties alphabetically), expanding subtrees
+        best-first using the cached completion lists as upper bounds.
+        """
+        node, word = self._find_prefix(prefix)
+        if node is None:
+            return iter(())
+        if order == 'lex':
+            return self._iter_lex(node, word, lo, hi)
+        if order == 'freq':
+            return self._iter_freq(node, word, lo, hi)
+        raise ValueError(f"Unknown order: '{order}'")
+
+    def page(self, page_number, page_size=20, **options):
+        """Return one page (numbered from 0) of iter_items(**options) as a list."""
+        start = page_number * page_size
+        return list(itertools.islice(self.iter_items(**options), start, start + page_size))
+
+    @staticmethod
+    def _outside_range(word, lo, hi):
+        """True if no word starting with `word` can fall in [lo, hi)."""
+        if hi is not None and word >= hi:
+            return True
+        return lo is not None and word < lo and not lo.startswith(word)
+
+    def _iter_lex(self, node, word, lo, hi):
+        stack = [(node, word)]
+        while stack:
+            node, word = stack.pop()
+            if node.is_terminal and (lo is None or word >= lo) and (hi is None or word < hi):
+                yield word, node.frequency
+            children = []
+            for char in sorted(node.children):
+                child = node.children[char]
+                child_word = word + self._edge_label(char, child)
+                if hi is not None and child_word >= hi:
+                    break
+                if not self._outside_range(child_word, lo, hi):
+                    children.append((child, child_word))
+            stack.extend(reversed(children))
+
+    def _iter_freq(self, node, word, lo, hi):
+        # Heap entries are (-frequency or -subtree bound, word, tiebreak, node);
+        # node is None for a word ready to be yielded.
+        tiebreak = itertools.count()
+        heap = []
+
+        def _push_node(node, word):
+            if self._outside_range(word, lo, hi):
+                return
+            if len(word) > COMPLETION_CACHE_DEPTH:
+                # Deep subtrees are small: push their words directly
+                for item_word, freq in self._subtree_items(node, word):
+                    if (lo is None or item_word >= lo) and (hi is None or item_word < hi):
+                        heapq.heappush(heap, (-freq, item_word, next(tiebreak), None))
+                return
+            top = self._top_completions(node, word)
+            if top:
+                heapq.heappush(heap, (-top[0][1], word, next(tiebreak), node))
+
+        _push_node(node, word)
+        while heap:
+            neg_freq, word, _, node = heapq.heappop(heap)
+            if node is None:
+                yield word, -neg_freq
+                continue
+            if node.is_terminal and (lo is None or word >= lo) and (hi is None or word < hi):
+                heapq.heappush(heap, (-node.frequency, word, next(tiebreak), None))
             for char, child in node.children.items():
-                words.extend(_collect(child, prefix + char))
-            return words
-        return _collect(self.root, '')
+                _push_node(child, word + self._edge_label(char, child))
+
+    def node_count(self):
+        """Count the nodes in the trie, including the root."""
+        count = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children.values())
+        return count
+
+    def memory_usage(self):
+        """Approximate bytes held by the trie's nodes, their child dicts and edge labels."""
+        total = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            total += sys.getsizeof(node) + sys.getsizeof(node.children)
+            if getattr(node, 'label', ''):
+                total += sys.getsizeof(node.label)
+            stack.extend(node.children.values())
+        return total
+
+    @staticmethod
+    def _edge_label(char, child):
+        """Characters spelled by the edge leading into `child`."""
+        return char
+
+    def _find_prefix(self, prefix):
+        """Return (node, word at node) for the node covering `prefix`, or (None, None)."""
+        node = self._find_node(prefix)
+        return (node, prefix) if node is not None else (None, None)
+
+    def _subtree_items(self, node, prefix):
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if node.is_terminal:
+                yield word, node.frequency
+            # Reversed so words come out in the trie's own (insertion) order
+            for char, child in reversed(node.children.items()):
+                stack.append((child, word + self._edge_label(char, child)))
+
+    def _top_completions(self, node, word):
+        if node.top is not None:
+            return node.top
+        if len(word) > COMPLETION_CACHE_DEPTH:
+            return heapq.nsmallest(COMPLETION_CACHE_SIZE, self._subtree_items(node, word),
+                                   key=lambda x: (-x[1], x[0]))
+        candidates = [(word, node.frequency)] if node.is_terminal else []
+        for char, child in node.children.items():
+            candidates.extend(self._top_completions(child, word + self._edge_label(char, child)))
+        node.top = heapq.nsmallest(COMPLETION_CACHE_SIZE, candidates, key=lambda x: (-x[1], x[0]))
+        return node.top
+
+    def complete(self, prefix, k=COMPLETION_CACHE_SIZE):
+        """
+        Return up to k (word, frequency) completions of `prefix`, most frequent
+        first. Nodes near the root keep a cached top list that is rebuilt
+        lazily after edits, so short prefixes answer without a subtree scan.
+        """
+        node, word = self._find_prefix(prefix)
+        if node is None or k <= 0:
+            return []
+        if k > COMPLETION_CACHE_SIZE:
+            return heapq.nsmallest(k, self._subtree_items(node, word), key=lambda x: (-x[1], x[0]))
+        return self._top_completions(node, word)[:k]
 
     def from_list(self, word_list):
-        self.root = TrieNode()
-        for word, freq in word_list:
-            self.add(word, freq)
+        with self._writing():
+            self.root = self.node_class(self._gen)
+            self.size = 0
+            self._record_reset()
+            for word, freq in word_list:
+                self.add(word, freq)
+
+    def _insert_sorted(self, items):
+        """
+        Insert (word, frequency) pairs given in sorted word order, setting
+        each frequency. The walk down the prefix shared with the previous
+        word is reused, so loading costs O(total characters).
+        """
+        path = [self._writable_root()]
+        previous = ''
+        for word, freq in items:
+            common = 0
+            while common < min(len(previous), len(word)) and previous[common] == word[common]:
+                common += 1
+            del path[common + 1:]
+            node = path[-1]
+            for char in word[common:]:
+                node = self._writable_child(node, char)
+                path.append(node)
+            if not node.is_terminal:
+                self.size += 1
+                node.is_terminal = True
+            node.frequency = freq
+            self._record_set(word, freq)
+            previous = word
+
+    def merge(self, other, policy='sum', weights=(1, 1)):
+        """
+        Merge another trie into this one in a single simultaneous traversal.
+        policy: 'sum', 'max', 'weighted' (weights[0] * ours + weights[1] * theirs)
+        or a function taking a list of (source, frequency) pairs, where
+        source 0 is this trie and source 1 is `other`.
+        Subtrees only `other` has are shared, not copied, when the policy
+        leaves their frequencies unchanged. A trie with a different node
+        layout (e.g. a RadixTrie) is merged word by word instead.
+        """
+        combine = _frequency_combiner(policy, weights)
+        if getattr(other, 'node_class', None) is not self.node_class:
+            self._merge_words(other, combine)
+            return
+        rescale_ours = combine([(0, 1)]) != 1
+        share_theirs = combine([(1, 1)]) == 1 and combine([(1, 2)]) == 2
+        other = other.snapshot()  # published nodes are never changed again
+
+        def _graft_words(node, word):
+            count = 0
+            stack = [(node, word)]
+            while stack:
+                node, word = stack.pop()
+                if node.is_terminal:
+                    count += 1
+                    self._record_set(word, node.frequency)
+                for char, child in node.children.items():
+                    stack.append((child, word + char))
+            return count
+
+        def _merge(node, theirs, word):
+            if theirs is not None and theirs.is_terminal:
+                pairs = [(0, node.frequency)] if node.is_terminal else []
+                pairs.append((1, theirs.frequency))
+                if not node.is_terminal:
+                    self.size += 1
+                    node.is_terminal = True
+                node.frequency = combine(pairs)
+                self._record_set(word, node.frequency)
+            elif node.is_terminal and rescale_ours:
+                node.frequency = combine([(0, node.frequency)])
+                self._record_set(word, node.frequency)
+
+            their_children = theirs.children if theirs is not None else {}
+            for char, their_child in their_children.items():
+                if char not in node.children and share_theirs:
+                    node.children[char] = their_child
+                    self.size += _graft_words(their_child, word + char)
+                else:
+                    _merge(self._writable_child(node, char), their_child, word + char)
+            if rescale_ours:
+                for char in list(node.children):
+                    if char not in their_children:
+                        _merge(self._writable_child(node, char), None, word + char)
+
+        with self._writing():
+            _merge(self._writable_root(), other.root, '')
+
+    def _merge_words(self, other, combine):
+        """merge() one word at a time, for tries whose edges do not line up with ours."""
+        theirs = dict(other.snapshot().to_list())
+        with self._writing():
+            if combine([(0, 1)]) != 1:
+                for word, freq in self.to_list():
+                    if word not in theirs:
+                        self.set_frequency(word, combine([(0, freq)]))
+            for word, freq in theirs.items():
+                node = self._find_node(word)
+                if node is not None and node.is_terminal:
+                    self.set_frequency(word, combine([(0, node.frequency), (1, freq)]))
+                else:
+                    self.add(word, combine([(1, freq)]))
+
+    def read_files_keywords(self, filenames, policy='sum', weights=None):
+        """
+        Build the trie from several keyword files at once. The sorted word
+        streams of all files are merged in one pass and words found in more
+        than one file are combined with `policy` ('sum', 'max', 'weighted' or
+        a function of (file index, frequency) pairs).
+        Replaces the existing trie only once every file has loaded,
+        so a missing or broken file leaves the current keywords in place.
+        """
+        combine = _frequency_combiner(policy, weights or [1] * len(filenames))
+
+        def _tagged(items, source):
+            for word, freq in items:
+                yield word, source, freq
+
+        def _combined(streams):
+            word, pairs = None, []
+            for item_word, source, freq in heapq.merge(*streams):
+                if item_word != word:
+                    if pairs:
+                        yield word, combine(pairs)
+                    word, pairs = item_word, []
+                if pairs and pairs[-1][0] == source:
+                    pairs[-1] = (source, pairs[-1][1] + freq)  # repeated within one file
+                else:
+                    pairs.append((source, freq))
+            if pairs:
+                yield word, combine(pairs)
 
-    def wildcard_search(self, pattern):
-        results = []
+        try:
+            streams = [_tagged(iter_sorted_keyword_file(filename), source)
+                       for source, filename in enumerate(filenames)]
+            fresh = type(self)()
+            with fresh._writing():
+                fresh._insert_sorted(_combined(streams))
+            self.replace_with(fresh)
+
+        except FileNotFoundError as e:
+            print(f"Error: File '{e.filename}' not found.")
+        except Exception as e:
+            print(f"Error reading file: {e}")
+
+    def wildcard_search(self, pattern, limits=None):
+        """
+        Return the words matching `pattern` ('*' matches any one letter) as
+        SearchResults, most frequent first. `limits` (a SearchLimits) caps
+        the result count, node visits and time spent.
+        With a reverse trie attached, patterns whose known letters sit at the
+        end are searched through it instead; see reverse_trie.
+        """
+        if self.reverse is not None:
+            results = self.reverse.wildcard_search(pattern, self.version, limits)
+            if results is not None:
+                return results
+        if limits is None:
+            results = self._wildcard_matches(pattern)
+            results.sort(key=lambda x: -x[1])  # sort by frequency descending
+            return results
+        budget = limits.budget()
+        return limits.finish(self._wildcard_matches(pattern, budget), budget)
+
+    def _wildcard_matches(self, pattern, budget=None):
+        """
+        Unsorted matches of `pattern`, in traversal order. With a budget,
+        every node visited is charged to it and the search stops early once
+        it runs out.
+        """
+        results = SearchResults()
 
         def dfs(node, i, path):
+            if budget is not None and not budget.spend():
+                return
             if i == len(pattern):
                 if node.is_terminal:
                     results.append((path, node.frequency))
@@ -139,53 +809,128 @@ class Trie:
             elif pattern[i] in node.children:
                 dfs(node.children[pattern[i]], i + 1, path + pattern[i])
         dfs(self.root, 0, '')
-        results.sort(key=lambda x: -x[1])  # sort by frequency descending
         return results
 
-    def best_match(self, pattern):
-        matches = self.wildcard_search(pattern)
+    def best_match(self, pattern, limits=None):
+        matches = self.wildcard_search(pattern, limits)
         return matches[0] if matches else None
     
-    def read_file_keywords(self, filename):
+    def read_file_keywords(self, filename, format=None):
         """
         Read keywords from a file and build the trie.
-        File format: word,frequency (one per line)
-        Clears existing trie before loading new data.
+        File format: word,frequency (one per line), or any format known to
+        iter_keyword_file, possibly compressed; see dictionary_readers.
+        Replaces the existing trie only once the whole file has loaded,
+        so a missing or broken file leaves the current keywords in place.
         """
         try:
-            self.root = TrieNode()
-            self.size = 0
-            
-            with open(filename, 'r', encoding='utf-8') as file:
-                for line in file:
-                    line = line.strip()
-                    if line:
-                        if ',' in line:
-                            parts = line.split(',')
-                            word = parts[0].strip()
-                            frequency = int(parts[1].strip()) if len(parts) > 1 else 1
-                        else:
-                            word = line
-                            frequency = 1
-                            
-                        if word:
-                            self.add(word, frequency)
+            fresh = type(self)()
+            with fresh._writing():
+                for word, frequency in iter_keyword_file(filename, format=format):
+                    fresh.add(word, frequency)
+            self.replace_with(fresh)
                             
         except FileNotFoundError:
             print(f"Error: File '{filename}' not found.")
         except Exception as e:
             print(f"Error reading file: {e}")
             
+    def diff_keyword_file(self, filename, format=None):
+        """
+        Compare a keyword file with the latest published keywords in one
+        merge pass over both in sorted order, and return the edits that
+        would make this trie match the file, in word order:
+            ('add', word, frequency)     (word only in the file)
+            ('set', word, frequency)     (frequency changed)
+            ('delete', word, None)       (word no longer in the file)
+        Words repeated in the file have their frequencies summed, as when loading.
+        """
+        changes = []
+        ours = self.snapshot().iter_items()
+        mine = next(ours, None)
+        theirs = _summed_repeats(iter_sorted_keyword_file(filename, format))
+        for word, freq in theirs:
+            while mine is not None and mine[0] < word:
+                changes.append(('delete', mine[0], None))
+                mine = next(ours, None)
+            if mine is not None and mine[0] == word:
+                if mine[1] != freq:
+                    changes.append(('set', word, freq))
+                mine = next(ours, None)
+            else:
+                changes.append(('add', word, freq))
+        while mine is not None:
+            changes.append(('delete', mine[0], None))
+            mine = next(ours, None)
+        return changes
+
+    def reload_keywords(self, filename, format=None):
+        """
+        Bring the trie in line with an edited keyword file by applying only
+        the differences (see diff_keyword_file) as one new version, instead
+        of rebuilding it. Only the paths to changed words are copied, so the
+        cached completions everywhere else are kept.
+        Returns a dict counting the 'add', 'set' and 'delete' edits, or None
+        if the file could not be read (the trie is then left unchanged).
+        """
+        try:
+            changes = self.diff_keyword_file(filename, format)
+        except FileNotFoundError:
+            print(f"Error: File '{filename}' not found.")
+            return None
+        except Exception as e:
+            print(f"Error reading file: {e}")
+            return None
+
+        counts = {'add': 0, 'set': 0, 'delete': 0}
+        deleted = []
+        with self._writing():
+            for change, word, freq in changes:
+                counts[change] += 1
+                if change == 'delete':
+                    deleted.append(word)
+                elif self.set_frequency(word, freq) is None:
+                    self.add(word, freq)  # edited concurrently since the diff
+            self.delete_many(deleted)
+        return counts
+
+    def load_in_background(self, filename, on_progress=None, on_done=None):
+        """
+        Load a keyword file into a fresh trie on a worker thread and swap it
+        in with replace_with() once complete. Until then this trie keeps
+        serving its current keywords. Returns the BackgroundLoad tracking it.
+        """
+        return BackgroundLoad(self, filename, on_progress, on_done)
+
+    def replace_with(self, other):
+        """
+        Atomically replace this trie's keywords with the latest published
+        version of `other`, as one new version. Readers and snapshots see
+        either the old keywords or the new ones, never a mix; `other` may
+        keep being edited afterwards, as its published nodes are never
+        changed in place.
+        """
+        if not isinstance(other, type(self)):
+            raise TypeError(f"Cannot replace a {type(self).__name__} with a {type(other).__name__}")
+        view = other.snapshot()
+        with self._writing():
+            self.root = view.root
+            self.size = view.size
+            self._record_reset()
+
     def write_keywords_to_file(self, filename):
         """
-        Write all keywords and their frequencies to a file.
+        Write all keywords and their frequencies to a file, in sorted order.
         File format: word,frequency (one per line)
         """
         try:
-            words = self.to_list()
+            # Streamed from a snapshot, so memory use does not grow with the trie
+            words = self.snapshot().iter_items()
             with open(filename, 'w', encoding='utf-8') as file:
                 for word, frequency in words:
                     file.write(f"{word},{frequency}\n")
+            if self.bloom is not None:
+                self.bloom.save(filename)  # the filter persists with the dictionary
                     
         except Exception as e:
             print(f"Error writing file: {e}")
@@ -228,6 +973,60 @@ class Trie:
 
 
 
+def iter_keyword_file(filename, progress=None, format=None, on_error=report_line_error):
+    """
+    Yield (word, frequency) pairs from a keyword file.
+    File format: word,frequency (one per line); a bare word has frequency 1.
+    Compressed (.gz/.bz2/.xz) files and the other formats registered in
+    dictionary_readers (tab-separated counts, Hunspell .dic) are streamed
+    too; malformed lines are reported through `on_error` and skipped.
+    If given, `progress` is called with the number of bytes read so far.
+    """
+    return iter_dictionary(filename, format, on_error, progress)
+
+
+def iter_sorted_keyword_file(filename, format=None):
+    """
+    Yield a keyword file's (word, frequency) pairs in sorted word order.
+    Files that are already sorted are streamed; others are sorted in memory.
+    """
+    previous = None
+    for word, frequency in iter_keyword_file(filename, format=format, on_error=None):
+        if previous is not None and word < previous:
+            yield from sorted(iter_keyword_file(filename, format=format), key=lambda x: x[0])
+            return
+        previous = word
+    yield from iter_keyword_file(filename, format=format)
+
+
+def _summed_repeats(items):
+    """Merge adjacent repeats of a word in sorted (word, frequency) pairs by summing."""
+    word, total = None, 0
+    for item_word, freq in items:
+        if item_word != word:
+            if word is not None:
+                yield word, total
+            word, total = item_word, 0
+        total += freq
+    if word is not None:
+        yield word, total
+
+
+def _frequency_combiner(policy, weights):
+    """
+    Return a function combining a list of (source, frequency) pairs into one frequency.
+    """
+    if callable(policy):
+        return policy
+    if policy == 'sum':
+        return lambda pairs: sum(freq for source, freq in pairs)
+    if policy == 'max':
+        return lambda pairs: max(freq for source, freq in pairs)
+    if policy == 'weighted':
+        return lambda pairs: round(sum(weights[source] * freq for source, freq in pairs))
+    raise ValueError(f"Unknown merge policy: '{policy}'")
+
+
 def match_case_pattern(original, matched):
     # Applies the capitalization pattern of `original` to `matched`
     result = []
@@ -0,0 +1,201 @@
+# trie_benchmark.py
+# ST1507 CA2 - Trie Benchmarks
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import weakref
+
+from parallel_restorer import free_threaded, restore_file_parallel
+from radix_trie import RadixTrie
+from reverse_trie import attach_reverse_trie
+from trie import Trie
+
+
+def _random_patterns(words, count, rng):
+    """Turn dictionary words into wildcard patterns by hiding one or two letters."""
+    patterns = []
+    for _ in range(count):
+        word = list(rng.choice(words))
+        for i in rng.sample(range(len(word)), min(len(word), rng.randint(1, 2))):
+            word[i] = '*'
+        patterns.append(''.join(word))
+    return patterns
+
+
+def benchmark_concurrent_reads(trie, readers=4, duration=2.0, with_writer=True, seed=1507):
+    """
+    Measure snapshot read throughput while a writer keeps editing frequencies
+    and adding/deleting words. Returns a dict with the measured figures.
+    """
+    rng = random.Random(seed)
+    words = [word for word, freq in trie.to_list()]
+    patterns = _random_patterns(words, 500, rng)
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0]
+    versions = []  # weak references to every root a reader saw
+
+    def reader(index):
+        local_rng = random.Random(seed + index)
+        count = 0
+        while not stop.is_set():
+            snapshot = trie.snapshot()
+            if count % 64 == 0:
+                versions.append(weakref.ref(snapshot.root))
+            snapshot.wildcard_search(local_rng.choice(patterns))
+            count += 1
+        reads[index] = count
+
+    def writer():
+        local_rng = random.Random(seed - 1)
+        while not stop.is_set():
+            word = local_rng.choice(words)
+            trie.set_frequency(word, local_rng.randint(1, 1000))
+            trie.add(word + "zz", 1)
+            trie.delete(word + "zz")
+            writes[0] += 3
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    if with_writer:
+        threads.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'readers': readers,
+        'reads_per_second': sum(reads) / elapsed,
+        'writes_per_second': writes[0] / elapsed,
+        'old_versions_alive': len({id(ref()) for ref in versions
+                                   if ref() is not None and ref() is not trie.root}),
+    }
+
+
+def compare_radix(filenames):
+    """
+    Load each lexicon into a Trie and a RadixTrie and report node counts
+    and approximate memory for both.
+    """
+    rows = []
+    for filename in filenames:
+        plain, radix = Trie(), RadixTrie()
+        plain.read_file_keywords(filename)
+        radix.read_file_keywords(filename)
+        rows.append({
+            'filename': filename,
+            'words': plain.size,
+            'trie_nodes': plain.node_count(),
+            'radix_nodes': radix.node_count(),
+            'trie_bytes': plain.memory_usage(),
+            'radix_bytes': radix.memory_usage(),
+        })
+    return rows
+
+
+def benchmark_reverse_search(filename, patterns=('**ing', '*ater', '*e*s', '***s', '**e', 'th**')):
+    """
+    Time each pattern with forward-only search and with a reverse trie
+    attached, and report the reverse trie's memory overhead.
+    """
+    forward, both = Trie(), Trie()
+    forward.read_file_keywords(filename)
+    both.read_file_keywords(filename)
+    index = attach_reverse_trie(both)
+    rows = []
+    for pattern in patterns:
+        timings = []
+        for trie in (forward, both):
+            start = time.perf_counter()
+            for _ in range(20):
+                trie.wildcard_search(pattern)
+            timings.append((time.perf_counter() - start) / 20)
+        rows.append({'pattern': pattern, 'forward_seconds': timings[0], 'planned_seconds': timings[1]})
+    return rows, index.memory_report()
+
+
+def benchmark_parallel_restore(trie, defect_filename, workers=(1, 2, 4), executors=('thread', 'process'),
+                               repeat=20, mode='best'):
+    """
+    Time restore_file_parallel over a document made of `repeat` copies of
+    `defect_filename`, for each executor and worker count. Threads only
+    scale on free-threaded builds; run this under both interpreters to
+    compare. Returns one dict per run.
+    """
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        document = os.path.join(tmp, "document.txt")
+        with open(defect_filename, encoding='utf-8') as f:
+            text = f.read()
+        with open(document, 'w', encoding='utf-8') as f:
+            for _ in range(repeat):
+                f.write(text if text.endswith('\n') else text + '\n')
+        output = os.path.join(tmp, "restored.txt")
+        for executor in executors:
+            for count in workers:
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    restore_file_parallel(trie, document, output, mode, count, executor)
+                rows.append({'executor': executor, 'workers': count,
+                             'seconds': time.perf_counter() - start})
+    return rows
+
+
+def main(argv):
+    filename = argv[1] if len(argv) > 1 else "stopwordsFreq.txt"
+    trie = Trie()
+    trie.read_file_keywords(filename)
+    print(f"Loaded {trie.size} words from '{filename}'.")
+
+    print("\nSnapshot reads under concurrent writes")
+    print("-" * 60)
+    for with_writer in (False, True):
+        result = benchmark_concurrent_reads(trie, with_writer=with_writer)
+        label = "with writer" if with_writer else "read only"
+        print(f"{label:>12}: {result['reads_per_second']:>10,.0f} reads/s "
+              f"{result['writes_per_second']:>10,.0f} writes/s "
+              f"(old versions still alive: {result['old_versions_alive']})")
+
+    print("\nRadix trie savings")
+    print("-" * 60)
+    for row in compare_radix([filename, "cat.txt", "news_keywords.txt"]):
+        node_saving = 1 - row['radix_nodes'] / row['trie_nodes']
+        byte_saving = 1 - row['radix_bytes'] / row['trie_bytes']
+        print(f"{row['filename']:>20}: {row['words']:>7,} words, "
+              f"nodes {row['trie_nodes']:,} -> {row['radix_nodes']:,} ({node_saving:.0%} fewer), "
+              f"memory {row['trie_bytes']:,} -> {row['radix_bytes']:,} bytes ({byte_saving:.0%} less)")
+
+    print("\nReverse trie for patterns with known endings")
+    print("-" * 60)
+    rows, report = benchmark_reverse_search(filename)
+    for row in rows:
+        print(f"{row['pattern']:>8}: forward {row['forward_seconds'] * 1000:.2f} ms, "
+              f"planned {row['planned_seconds'] * 1000:.2f} ms")
+    print(f"reverse trie: {report['reverse_nodes']:,} nodes, {report['reverse_bytes']:,} bytes "
+          f"({report['overhead']:.0%} of the forward trie)")
+
+    print(f"\nParallel restoration ({'free-threaded' if free_threaded() else 'GIL'} build, "
+          f"Python {sys.version.split()[0]})")
+    print("-" * 60)
+    rows = benchmark_parallel_restore(trie, "post1_defect.txt")
+    baseline = {}
+    for row in rows:
+        baseline.setdefault(row['executor'], row['seconds'])
+        print(f"{row['executor']:>8} x{row['workers']}: {row['seconds']:.3f} s "
+              f"(speed-up {baseline[row['executor']] / row['seconds']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,211 @@
+# trie_journal.py
+# ST1507 CA2 - Append-only Edit Journal for the Trie
+# Shu Zhi and Ashley
+# DAAA/2A/03
+
+import os
+import threading
+import time
+
+
+class TrieJournal:
+    """
+    Records trie edits in an append-only journal next to a keyword file,
+    so saving a single edit no longer rewrites the whole dictionary.
+
+    Journal lines hold the resulting state of a word, which makes replay
+    idempotent:
+        =word,frequency     (word now has this frequency)
+        -word               (word was deleted)
+
+    Appends are flushed at once but fsynced in batches: every entry is on
+    disk after at most `sync_every` entries or `sync_interval` seconds,
+    whichever comes first (a background timer covers an edit followed by
+    idle time), so a crash loses at most that window of edits.
+
+    The keyword file acts as the snapshot. Once the journal grows past
+    `compact_threshold` entries it is folded back into the keyword file
+    on a background thread. When the trie's words are replaced wholesale
+    (from_list, replace_with, read_file_keywords), which is not journalled
+    word by word, the keyword file is rewritten as soon as that write is
+    published.
+    """
+
+    def __init__(self, trie, base_filename, journal_filename=None,
+                 sync_every=64, sync_interval=1.0, compact_threshold=1000):
+        self.trie = trie
+        self.base_filename = base_filename
+        self.journal_filename = journal_filename or base_filename + ".journal"
+        self.rotated_filename = self.journal_filename + ".old"
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = 0       # entries written since the last fsync
+        self._entries = 0       # entries in the current journal file
+        self._last_sync = time.monotonic()
+        self._sync_timer = None  # pending timed fsync, if any
+        self._compactor = None  # background compaction thread, if running
+        self._reset = False     # the trie was replaced wholesale since the last compaction
+
+    def open(self):
+        """
+        Load the keyword file, replay any journalled edits on top of it and
+        start journalling further edits. Returns the number of replayed entries.
+        """
+        self.trie.journal = None
+        if os.path.exists(self.base_filename):
+            self.trie.read_file_keywords(self.base_filename)
+        else:
+            self.trie.from_list([])
+
+        replayed = self._replay(self.rotated_filename)
+        self._entries = self._replay(self.journal_filename)
+        replayed += self._entries
+
+        self._file = open(self.journal_filename, 'a', encoding='utf-8')
+        self.trie.journal = self
+
+        # A rotated journal means an earlier compaction never finished
+        if os.path.exists(self.rotated_filename):
+            self.compact(background=False)
+        return replayed
+
+    def _replay(self, filename):
+        if not os.path.exists(filename):
+            return 0
+        count = 0
+        with open(filename, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.rstrip('\n')
+                if line.startswith('='):
+                    word, _, freq = line[1:].rpartition(',')
+                    try:
+                        freq = int(freq)
+                    except ValueError:
+                        continue  # torn write at the end of the journal
+                    if self.trie.set_frequency(word, freq) is None:
+                        self.trie.add(word, freq)
+                    count += 1
+                elif line.startswith('-') and len(line) > 1:
+                    self.trie.delete(line[1:])
+                    count += 1
+        return count
+
+    def record_set(self, word, freq):
+        self._append(f"={word},{freq}\n")
+
+    def record_delete(self, word):
+        self._append(f"-{word}\n")
+
+    def record_reset(self):
+        self._reset = True
+
+    def _append(self, line):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            self._pending += 1
+            self._entries += 1
+            waited = time.monotonic() - self._last_sync
+            if self._pending >= self.sync_every or waited >= self.sync_interval:
+                self._sync_locked()
+            elif self._sync_timer is None:
+                # Make sure this entry reaches disk even if no further edit comes
+                self._sync_timer = threading.Timer(self.sync_interval - waited, self.sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+
+    def maybe_compact(self):
+        """
+        Called by the trie after it publishes a new version, so the snapshot
+        taken for compaction includes every journalled edit.
+        """
+        if self._reset:
+            # The journal cannot express a replacement, so fold it in now
+            self._reset = False
+            compactor = self._compactor
+            if compactor is not None:
+                compactor.join()
+            self.compact(background=False)
+        elif self._entries >= self.compact_threshold:
+            self.compact()
+
+    def _sync_locked(self):
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
+
+    def sync(self):
+        """Force all journalled edits to disk."""
+        with self._lock:
+            self._sync_locked()
+
+    def compact(self, background=True):
+        """
+        Fold the journal into the keyword file.
+        The journal is rotated against a snapshot of the trie, so new edits
+        keep flowing into a fresh journal while the keyword file is rewritten.
+        """
+        # Holding the trie's write lock guarantees every journalled edit is
+        # already part of the published snapshot.
+        with self.trie._write_lock, self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            snapshot = self.trie.snapshot()
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+            if os.path.exists(self.journal_filename):
+                if os.path.exists(self.rotated_filename):
+                    # Keep the unfinished rotation; append the newer entries to it
+                    with open(self.journal_filename, 'r', encoding='utf-8') as src, \
+                            open(self.rotated_filename, 'a', encoding='utf-8') as dst:
+                        dst.write(src.read())
+                    os.remove(self.journal_filename)
+                else:
+                    os.replace(self.journal_filename, self.rotated_filename)
+            self._file = open(self.journal_filename, 'a', encoding='utf-8')
+            self._entries = 0
+
+            if background:
+                self._compactor = threading.Thread(
+                    target=self._write_base, args=(snapshot,), daemon=True)
+                self._compactor.start()
+                return
+        self._write_base(snapshot)
+
+    def _write_base(self, snapshot):
+        tmp_filename = self.base_filename + ".tmp"
+        try:
+            with open(tmp_filename, 'w', encoding='utf-8') as file:
+                for word, frequency in snapshot.iter_items():
+                    file.write(f"{word},{frequency}\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_filename, self.base_filename)
+            if os.path.exists(self.rotated_filename):
+                os.remove(self.rotated_filename)
+        except Exception as e:
+            print(f"Error compacting journal: {e}")
+
+    def close(self):
+        """Wait for any running compaction, sync the journal and detach it."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self.trie.journal is self:
+            self.trie.journal = None